@@ -84,7 +84,7 @@ async def startup_event():
     eq_reg.llm_provider = llm_provider
     
     int_par = IntentParser()
-    int_par.llm_provider = llm_provider
+    int_par.set_llm_provider(llm_provider)
     
     # Use the DATA_FOLDER environment variable for the CSVStore
     data_folder = os.getenv("DATA_FOLDER", "/app/data")
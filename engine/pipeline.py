@@ -7,7 +7,7 @@ import logging
 import time
 from typing import Dict, Any, List, Optional
 
-from semantic.intent_parser import IntentParser
+from semantic.intent_parser import IntentParser, thaw_intent
 from semantic.llm_provider import LLMProvider
 from semantic.variable_catalog import VariableCatalog
 from nfg_math.equations import EquationRegistry
@@ -59,7 +59,7 @@ class Pipeline:
         
         # Step 1: Parse intent using LLM
         logger.info(f"Parsing intent for query: {text}")
-        intent = self.intent_parser.parse(text)
+        intent = thaw_intent(self.intent_parser.parse(text))
         metric = intent.get("metric")
         
         if not metric:
@@ -101,6 +101,9 @@ class Pipeline:
             if k in ['country', 'tech', 'year', 'model', 'scenario'] and v is not None
         }
         
+        # Map all required variables in one LLM call
+        self.variable_catalog.prefetch_mappings(required_vars, available_properties)
+        
         # For each required variable, find mappings and query data
         for var_name in required_vars:
             # Get variable mapping using the variable catalog
@@ -9,7 +9,7 @@ import json
 import logging
 from typing import Dict, Any, List, Optional, Tuple, Set
 
-from semantic.intent_parser import IntentParser
+from semantic.intent_parser import IntentParser, thaw_intent
 from semantic.llm_provider import LLMProvider
 from semantic.variable_catalog import VariableCatalog
 from nfg_math.equations import EquationRegistry
@@ -155,7 +155,7 @@ class Pipeline:
             Dict with answer, including result, method, inputs, and citations
         """
         # Step 1: Parse intent using LLM
-        intent = self.intent_parser.parse(text)
+        intent = thaw_intent(self.intent_parser.parse(text))
         metric = intent.get("metric")
         
         if not metric:
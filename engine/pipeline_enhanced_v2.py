@@ -9,18 +9,12 @@ import json
 import logging
 from typing import Dict, Any, List, Optional, Tuple, Set
 
-from semantic.intent_parser import IntentParser
+from semantic.intent_parser import IntentParser, thaw_intent
 from semantic.llm_provider import LLMProvider
 from semantic.variable_catalog import VariableCatalog
 from nfg_math.equations import EquationRegistry
 from data_io.csv_store import CSVStore
 
-# Import the enhanced LLM provider methods
-try:
-    import semantic.llm_provider_enhanced
-except ImportError:
-    logger.warning("Could not import enhanced LLM provider methods. Using default methods.")
-
 logger = logging.getLogger(__name__)
 
 class EnhancedPipeline:
@@ -311,7 +305,7 @@ class EnhancedPipeline:
             Dict with answer, including result, method, inputs, citations, and narrative
         """
         # Step 1: Parse intent using LLM
-        intent = self.intent_parser.parse(text)
+        intent = thaw_intent(self.intent_parser.parse(text))
         metric = intent.get("metric")
         
         if not metric:
@@ -21,7 +21,7 @@ sys.path.insert(0, PROJECT_ROOT)
 
 # Import with clean path
 from semantic.llm_provider import LLMProvider
-from semantic.intent_parser import IntentParser
+from semantic.intent_parser import IntentParser, thaw_intent
 
 def main():
     """Run a simple example query"""
@@ -44,7 +44,7 @@ def main():
     # Parse the query
     intent = parser.parse(query)
     
-    logger.info(f"Parsed intent: {json.dumps(intent, indent=2)}")
+    logger.info(f"Parsed intent: {json.dumps(thaw_intent(intent), indent=2)}")
     
     return 0
 
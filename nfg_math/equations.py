@@ -123,8 +123,8 @@ class EquationRegistry:
         if not eq:
             return "Unknown"
             
-        # Return unit if provided in equation definition
-        if 'unit' in eq:
+        # Return unit if provided in equation definition (LLM equations may carry unit=None)
+        if eq.get('unit'):
             return eq['unit']
             
         # Map common metrics to units
@@ -263,7 +263,7 @@ class EquationRegistry:
         """
         # If we have a unit in the equation metadata, use that first
         eq = self.get_equation(metric)
-        if eq and 'unit' in eq:
+        if eq and eq.get('unit'):
             return eq['unit']
             
         # Try to get unit from LLM provider if available
@@ -2,20 +2,123 @@
 Dynamic intent parser for NFG analytics. Uses LLM provider for all parsing.
 No hardcoded values - everything determined by LLM at runtime.
 No YAML file dependencies - all configuration generated dynamically.
+
+IntentParser.parse and parse_batch return read-only intents
+(types.MappingProxyType, with a read-only "confidence" mapping) so cached
+results can be shared without copying. Callers that need a mutable or
+JSON-serializable dict should call thaw_intent(intent).
 """
 import re
 import os
+import asyncio
 import json
 import logging
-import traceback
-from typing import Dict, Any, Optional
+import functools
+from types import MappingProxyType
+from typing import Dict, Any, AsyncIterator, List, Mapping, Optional, Tuple
+
+# Prefer RE2 (linear-time DFA) for the combined fallback pattern when installed
+try:
+    import re2 as _re
+except ImportError:
+    _re = re
 
 logger = logging.getLogger(__name__)
 
 # No YAML config file - everything will be generated dynamically
 CONFIG = {}
 
+# Keyword tables for the local regex fallback
+METRIC_KEYWORDS = {
+    "LCOE": ["lcoe", "levelized cost", "cost of electricity", "cost of generation"],
+    "GENERATION_GWh": ["generation", "output", "produced", "electricity production"],
+    "CAPACITY_MW": ["capacity", "installed capacity", "power capacity"],
+    "CAPACITY_FACTOR": ["capacity factor", "cf", "utilization", "utilisation"],
+    "EMISSIONS_tCO2": ["emission", "emissions", "carbon", "co2", "greenhouse"],
+    "NPV": ["npv", "net present value", "present value", "discounted value"]
+}
+
+TECH_KEYWORDS = {
+    "NUCLEAR": ["nuclear", "npp", "atomic", "uranium"],
+    "CCGT": ["ccgt", "gas turbine", "combined cycle", "gas-fired", "natural gas"],
+    "WIND": ["wind", "onshore wind", "offshore wind", "turbine", "wind farm"],
+    "SOLAR": ["solar", "pv", "photovoltaic", "solar panel"],
+    "HYDRO": ["hydro", "hydroelectric", "hydropower", "water power", "dam"]
+}
+
+COUNTRY_KEYWORDS = {
+    "BE": ["belgium", "belgian", "be"],
+    "FR": ["france", "french", "fr"],
+    "DE": ["germany", "german", "de"],
+    "UK": ["uk", "united kingdom", "britain", "british", "england"],
+    "IT": ["italy", "italian", "it"],
+    "ES": ["spain", "spanish", "es"]
+}
+
+OPERATION_KEYWORDS = {
+    "avg": ["average", "avg", "mean"],
+    "max": ["maximum", "max"],
+    "min": ["minimum", "min"],
+    "sum": ["total", "sum"]
+}
+
+# Fields every validated intent carries
+_REQUIRED_FIELDS = ("metric", "tech", "country", "year", "fuel", "network", "operation")
+_REQUIRED_SET = frozenset(_REQUIRED_FIELDS)
+
+# Fields the pipeline needs to answer a query, and the minimum regex
+# completeness score for parse_batch to skip the LLM
+BATCH_REQUIRED_FIELDS = ("metric", "tech", "country", "year")
+BATCH_FAST_PATH_THRESHOLD = 0.6
+
+# Maximum number of queries parse_iter parses at the same time
+PARSE_ITER_CONCURRENCY = 8
+
+# Number of distinct normalized queries kept in each parser's result cache
+PARSE_CACHE_SIZE = 1024
+
+def _build_fallback_pattern() -> str:
+    """
+    Build one alternation with a named group per keyword, e.g.
+    (?P<year>20\d{2})|(?P<metric__LCOE__0>lcoe)|(?P<tech__NUCLEAR__1>nuclear)|...
+    Group names encode "<field>__<value>__<n>". Longer keywords come first
+    so "capacity factor" beats "capacity" at the same position. Keywords are
+    lowercase; the pattern matches case-insensitively so the query is never copied.
+    """
+    entries = []
+    for field, table in (("metric", METRIC_KEYWORDS), ("tech", TECH_KEYWORDS),
+                         ("country", COUNTRY_KEYWORDS), ("operation", OPERATION_KEYWORDS)):
+        for value, keywords in table.items():
+            for keyword in keywords:
+                entries.append((keyword, field, value))
+    entries.sort(key=lambda entry: len(entry[0]), reverse=True)
+    
+    groups = [r"(?P<year>20\d{2})"]
+    for n, (keyword, field, value) in enumerate(entries):
+        groups.append(f"(?P<{field}__{value}__{n}>{re.escape(keyword)})")
+    # Case-insensitive inline flag, understood by both re and RE2
+    return r"(?i)\b(?:" + "|".join(groups) + r")\b"
+
+_FALLBACK_RE = _re.compile(_build_fallback_pattern())
+
+def freeze_intent(intent: Dict[str, Any]) -> Mapping[str, Any]:
+    """Wrap an intent and its confidence dict in read-only views"""
+    return MappingProxyType({**intent, "confidence": MappingProxyType(dict(intent.get("confidence") or {}))})
+
+def thaw_intent(intent: Mapping[str, Any]) -> Dict[str, Any]:
+    """Return a mutable, JSON-serializable copy of a (possibly read-only) intent"""
+    return {**intent, "confidence": dict(intent.get("confidence") or {})}
+
+class _LLMParseFailed(Exception):
+    """Raised through the parse cache so a regex fallback result is never memoized"""
+
+def _normalize(text: str) -> str:
+    """Collapse runs of whitespace so trivially different queries share a cache entry"""
+    return " ".join(text.split())
+
 class IntentParser:
+    __slots__ = ("config", "_llm_provider", "_has_llm", "_lru")
+    
     def __init__(self, config: Dict[str, Any] = None):
         """
         Initialize intent parser with config and LLM provider.
@@ -24,47 +127,95 @@ class IntentParser:
             config: Optional configuration dictionary
         """
         self.config = config or CONFIG
+        self._lru = functools.lru_cache(maxsize=PARSE_CACHE_SIZE)(self._parse_frozen)
         self.llm_provider = None  # Will be set by pipeline
 
+    @property
+    def llm_provider(self):
+        """LLM provider used for parsing (None for regex-only parsing)"""
+        return self._llm_provider
+    
+    @llm_provider.setter
+    def llm_provider(self, provider):
+        self._llm_provider = provider
+        self._has_llm = provider is not None
+        # Results parsed with the previous provider are no longer valid
+        self._lru.cache_clear()
+
     def set_llm_provider(self, provider):
         """Set LLM provider for dynamic intent parsing"""
         self.llm_provider = provider
         
-    def parse(self, text: str) -> Dict[str, Any]:
+    def cache_clear(self) -> None:
+        """Drop all memoized parse results"""
+        self._lru.cache_clear()
+        
+    def parse(self, text: str) -> Mapping[str, Any]:
         """
         Parse user question using LLM to extract intent.
         Extracts metric, tech, fuel, network, country, year, scenario/model, requested op, and confidence.
         No hardcoded dependencies - all parsing done by LLM.
+        Results are memoized per whitespace-normalized query and returned read-only;
+        regex fallbacks after a failed LLM call are not memoized, so the LLM is retried.
         
         Args:
             text: User query text
             
         Returns:
-            Dict with parsed intent fields and confidence scores
+            Read-only mapping with parsed intent fields and confidence scores
+        """
+        text = _normalize(text)
+        try:
+            return self._lru(text)
+        except _LLMParseFailed:
+            # Degraded results stay out of the cache so the next call retries the LLM
+            return freeze_intent(self._fallback(text))
+    
+    def _parse_frozen(self, text: str) -> Mapping[str, Any]:
+        """
+        Parse a normalized query and freeze the result for caching.
+        Raises _LLMParseFailed instead of returning a regex fallback when the
+        LLM is configured but did not produce an intent.
         """
         logger.info(f"Parsing intent from text: {text}")
-            
-        # If LLM provider is available, use it for parsing
-        if self.llm_provider is not None:
-            try:
-                print("DEBUG - Using LLM provider for intent parsing")
-                logger.debug("Using LLM provider for intent parsing")
-                intent = self.llm_provider.parse_nfg_intent(text)
-                print(f"DEBUG - LLM provider returned: {json.dumps(intent) if intent else 'None'}")
-                if intent:
-                    # Validate the intent structure
-                    self._validate_and_enhance_intent(intent)
-                    logger.info(f"Successfully parsed intent: {intent}")
-                    return intent
-            except Exception as e:
-                print(f"DEBUG - Error using LLM for intent parsing: {str(e)}")
-                logger.error(f"Error using LLM for intent parsing: {str(e)}")
-                import traceback
-                print(f"DEBUG - Error traceback: {traceback.format_exc()}")
-        else:
+        
+        if not self._has_llm:
+            # Without an LLM the regex result is final, so it is cached too
             print("DEBUG - LLM provider is None")
+            return freeze_intent(self._fallback(text))
         
-        # Fallback to basic regex parsing if LLM is not available or fails
+        intent = self._parse_with_llm(text)
+        if intent is None:
+            raise _LLMParseFailed(text)
+        return freeze_intent(intent)
+    
+    def _parse_with_llm(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Parse a normalized query with the LLM provider, without consulting the result cache.
+        
+        Args:
+            text: Normalized user query text
+            
+        Returns:
+            Dict with parsed intent fields and confidence scores, or None if the LLM failed
+        """
+        try:
+            print("DEBUG - Using LLM provider for intent parsing")
+            logger.debug("Using LLM provider for intent parsing")
+            # The provider's own regex fallback would otherwise be memoized as an LLM result
+            intent = self.llm_provider.parse_nfg_intent(text, fallback=False)
+            print(f"DEBUG - LLM provider returned: {json.dumps(intent) if intent else 'None'}")
+            if intent:
+                # Validate the intent structure
+                self._validate_and_enhance_intent(intent)
+                logger.info(f"Successfully parsed intent: {intent}")
+                return intent
+        except Exception as e:
+            logger.exception("Error using LLM for intent parsing: %s", e)
+        return None
+    
+    def _fallback(self, text: str) -> Dict[str, Any]:
+        """Parse with the local regex fallback when the LLM is not available or fails"""
         print("DEBUG - LLM intent parsing failed or unavailable, using local regex fallback")
         logger.warning("LLM intent parsing failed or unavailable, using local regex fallback")
         result = self._local_regex_fallback(text)
@@ -72,6 +223,90 @@ class IntentParser:
         logger.info(f"Fallback intent parsing result: {result}")
         return result
     
+    def parse_batch(self, texts: List[str], threshold: float = BATCH_FAST_PATH_THRESHOLD) -> List[Mapping[str, Any]]:
+        """
+        Parse several queries, resolving the simple ones with the local regex fallback.
+        Queries whose regex result scores below the threshold go to the LLM, all
+        of them in one request when the provider supports batched parsing.
+        
+        Args:
+            texts: User query texts
+            threshold: Minimum completeness score to accept the regex result
+            
+        Returns:
+            List of read-only parsed intents in the same order as texts
+        """
+        results: List[Optional[Mapping[str, Any]]] = []
+        residual = []
+        for i, text in enumerate(texts):
+            intent = self._local_regex_fallback(text)
+            if not self._has_llm or self._completeness_score(intent) >= threshold:
+                results.append(freeze_intent(intent))
+            else:
+                results.append(None)
+                residual.append(i)
+        
+        if len(residual) > 1 and hasattr(self.llm_provider, 'parse_nfg_intents_batch'):
+            try:
+                intents = self.llm_provider.parse_nfg_intents_batch([_normalize(texts[i]) for i in residual])
+            except Exception as e:
+                logger.error(f"Error parsing intents in batch: {str(e)}")
+                intents = [None] * len(residual)
+            for i, intent in zip(residual, intents):
+                if intent:
+                    self._validate_and_enhance_intent(intent)
+                    results[i] = freeze_intent(intent)
+        
+        # Anything the batch did not resolve is parsed (and cached) one query at a time
+        for i in residual:
+            if results[i] is None:
+                results[i] = self.parse(texts[i])
+        
+        return results
+    
+    async def parse_iter(self, texts: List[str],
+                         concurrency: int = PARSE_ITER_CONCURRENCY) -> AsyncIterator[Tuple[int, Mapping[str, Any]]]:
+        """
+        Parse several queries concurrently and yield each intent as soon as it is ready.
+        Results arrive in completion order, so cached queries are yielded almost
+        immediately while slower LLM calls are still in flight.
+        
+        Args:
+            texts: User query texts
+            concurrency: Maximum number of queries parsed at the same time
+            
+        Yields:
+            (index into texts, read-only parsed intent) tuples
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def parse_one(index: int, text: str) -> Tuple[int, Mapping[str, Any]]:
+            async with semaphore:
+                # parse blocks on the LLM call, so run it off the event loop
+                return index, await asyncio.to_thread(self.parse, text)
+        
+        tasks = [asyncio.create_task(parse_one(i, text)) for i, text in enumerate(texts)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    @staticmethod
+    def _completeness_score(intent: Dict[str, Any]) -> float:
+        """
+        Score a parsed intent as (fraction of required fields filled) x (mean confidence).
+        An intent without a metric always scores 0 since the pipeline cannot answer it.
+        """
+        if intent.get("metric") is None:
+            return 0.0
+        
+        confidences = [intent["confidence"].get(field, 0.0)
+                       for field in BATCH_REQUIRED_FIELDS if intent.get(field) is not None]
+        filled = len(confidences) / len(BATCH_REQUIRED_FIELDS)
+        return filled * (sum(confidences) / len(confidences))
+    
     def _validate_and_enhance_intent(self, intent: Dict[str, Any]) -> None:
         """
         Validate and enhance the parsed intent with additional checks and defaults.
@@ -79,20 +314,20 @@ class IntentParser:
         Args:
             intent: The parsed intent dictionary to validate
         """
-        # Ensure all required fields exist
-        required_fields = ["metric", "tech", "country", "year", "fuel", "network", "operation"]
-        for field in required_fields:
-            if field not in intent:
-                intent[field] = None
+        # Fast path: complete intent with a confidence for every field
+        confidence = intent.get("confidence")
+        if _REQUIRED_SET.issubset(intent) and confidence is not None and _REQUIRED_SET.issubset(confidence):
+            return
         
-        # Ensure confidence object exists
-        if "confidence" not in intent:
-            intent["confidence"] = {}
-            
-        # Add empty confidence entries for any fields without them
-        for field in required_fields:
-            if field not in intent["confidence"] and intent[field] is not None:
-                intent["confidence"][field] = 0.7  # Default moderate confidence
+        # Ensure the confidence object exists
+        if confidence is None:
+            confidence = intent["confidence"] = {}
+        
+        # Fill missing fields and give set fields without a confidence a default in one pass
+        for field in _REQUIRED_FIELDS:
+            value = intent.setdefault(field, None)
+            if value is not None and field not in confidence:
+                confidence[field] = 0.7  # Default moderate confidence
     
     def _local_regex_fallback(self, text: str) -> Dict[str, Any]:
         """
@@ -111,96 +346,18 @@ class IntentParser:
             "operation": None, "confidence": {}
         }
         
-        text_lower = text.lower()
-        
-        # Year extraction with improved patterns
-        year_patterns = [
-            r"(20\d{2})",          # Standard year format
-            r"by\s+(20\d{2})",     # "by 2050" format
-            r"in\s+(20\d{2})"      # "in 2050" format
-        ]
-        
-        for pattern in year_patterns:
-            year_match = re.search(pattern, text)
-            if year_match:
-                # Extract the actual year digits
-                year_str = re.search(r"20\d{2}", year_match.group(0)).group(0)
-                result["year"] = int(year_str)
-                result["confidence"]["year"] = 0.9
-                break
-        
-        # Enhanced keyword matching for metrics
-        metrics = {
-            "LCOE": ["lcoe", "levelized cost", "cost of electricity", "cost of generation"],
-            "GENERATION_GWh": ["generation", "output", "produced", "electricity production"],
-            "CAPACITY_MW": ["capacity", "installed capacity", "power capacity"],
-            "CAPACITY_FACTOR": ["capacity factor", "cf", "utilization", "utilisation"],
-            "EMISSIONS_tCO2": ["emission", "carbon", "co2", "greenhouse"],
-            "NPV": ["npv", "net present value", "present value", "discounted value"]
-        }
-        
-        for metric_name, keywords in metrics.items():
-            if any(keyword in text_lower for keyword in keywords):
-                result["metric"] = metric_name
-                result["confidence"]["metric"] = 0.8
-                break
+        # Single case-insensitive pass over the text; the first match in each category wins
+        for match in _FALLBACK_RE.finditer(text):
+            group = match.lastgroup
+            if group == "year":
+                if result["year"] is None:
+                    result["year"] = int(match.group(group))
+                    result["confidence"]["year"] = 0.9
+                continue
             
-        # Enhanced tech detection
-        technologies = {
-            "NUCLEAR": ["nuclear", "npp", "atomic", "uranium"],
-            "CCGT": ["ccgt", "gas turbine", "combined cycle", "gas-fired", "natural gas"],
-            "WIND": ["wind", "onshore wind", "offshore wind", "turbine", "wind farm"],
-            "SOLAR": ["solar", "pv", "photovoltaic", "solar panel"],
-            "HYDRO": ["hydro", "hydroelectric", "hydropower", "water power", "dam"]
-        }
-        
-        for tech_name, keywords in technologies.items():
-            if any(keyword in text_lower for keyword in keywords):
-                result["tech"] = tech_name
-                result["confidence"]["tech"] = 0.8
-                break
-                
-        # Country detection
-        countries = {
-            "BE": ["belgium", "belgian", "be"],
-            "FR": ["france", "french", "fr"],
-            "DE": ["germany", "german", "de"],
-            "UK": ["uk", "united kingdom", "britain", "british", "england"],
-            "IT": ["italy", "italian", "it"],
-            "ES": ["spain", "spanish", "es"]
-        }
-        
-        for code, keywords in countries.items():
-            if any(keyword in text_lower for keyword in keywords):
-                result["country"] = code
-                result["confidence"]["country"] = 0.8
-                break
-                
-        # Basic operation detection
-        if "average" in text_lower or "avg" in text_lower or "mean" in text_lower:
-            result["operation"] = "avg"
-            result["confidence"]["operation"] = 0.8
-        elif "maximum" in text_lower or "max" in text_lower:
-            result["operation"] = "max"
-            result["confidence"]["operation"] = 0.8
-        elif "minimum" in text_lower or "min" in text_lower:
-            result["operation"] = "min"
-            result["confidence"]["operation"] = 0.8
-        elif "total" in text_lower or "sum" in text_lower:
-            result["operation"] = "sum"
-            result["confidence"]["operation"] = 0.8
+            field, value, _ = group.split("__")
+            if result[field] is None:
+                result[field] = value
+                result["confidence"][field] = 0.8
             
         return result
-                
-        # Simple country detection
-        for country, keywords in [
-            ("BE", ["belgium", "be"]),
-            ("FR", ["france", "fr"]),
-            ("ES", ["spain", "es"]),
-        ]:
-            if any(keyword in text_lower for keyword in keywords):
-                result["country"] = country
-                result["confidence"]["country"] = 0.8
-                break
-        
-        return result
\ No newline at end of file
@@ -3,20 +3,32 @@ Generic LLM provider for NFG energy analytics. Supports OpenAI and other provide
 Handles all dynamic content determination through API calls.
 """
 import os
+import sys
+import atexit
+import copy
 import json
+import asyncio
 import logging
+import functools
+import threading
 import time
 import tiktoken
 import re
-from typing import Dict, Any, List, Optional, Union
+import httpx
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Tuple, Union, ClassVar
+from tenacity import (retry, stop_after_attempt, wait_exponential_jitter,
+                      retry_if_exception_type, before_sleep_log)
 
 # Import model configuration
 from .model_config import ModelConfig
 from utils.metrics import Metrics
+from utils.disk_cache import DiskCache
 
 # Try multiple OpenAI client implementations - support both old and new API
 try:
-    from openai import OpenAI
+    from openai import OpenAI, AsyncOpenAI
     OPENAI_NEW_API = True
 except ImportError:
     try:
@@ -25,9 +37,522 @@ except ImportError:
     except ImportError:
         logging.error("OpenAI package not found. Please install with: pip install openai")
 
+# Transient API errors worth retrying (rate limits, dropped connections and timeouts)
+try:
+    from openai import RateLimitError, APIConnectionError
+    _TRANSIENT_API_ERRORS = (RateLimitError, APIConnectionError)
+except ImportError:
+    _TRANSIENT_API_ERRORS = ()
+
+# Optional Rust JSON parser for LLM responses; its JSONDecodeError subclasses json.JSONDecodeError
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# HTTP/2 needs the optional h2 package; without it the pooled clients use HTTP/1.1 keep-alive
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+# Optional C-extension Aho-Corasick matcher for the keyword fallback
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 logger = logging.getLogger(__name__)
 
+# Keyword sections of the fallback mappings and the intent field each one fills
+_KEYWORD_CATEGORIES = (("metrics", "metric"), ("technologies", "tech"), ("countries", "country"))
+
+# Minimal keyword mappings used when the LLM cannot generate them
+_MINIMAL_KEYWORD_MAPPINGS = {
+    "metrics": {
+        "LCOE": ["lcoe", "levelized cost"],
+        "NPV": ["npv", "net present value"],
+        "CAPACITY_FACTOR": ["capacity factor", "cf"]
+    },
+    "technologies": {
+        "NUCLEAR": ["nuclear"],
+        "WIND": ["wind"],
+        "SOLAR": ["solar"]
+    },
+    "countries": {
+        "BE": ["belgium", "belgian"],
+        "FR": ["france", "french"],
+        "UK": ["uk", "united kingdom"]
+    }
+}
+
+def _normalize_keyword_mappings(mappings: Dict[str, Dict[str, List[str]]]) -> Dict[str, Dict[str, Tuple[str, ...]]]:
+    """
+    Lowercase keywords and intern canonical names once, so the fallback scan
+    never has to normalize per keyword.
+    
+    Args:
+        mappings: Keyword mappings as returned by the LLM or the disk cache
+        
+    Returns:
+        Mappings with interned canonical names and tuples of lowercase keywords
+    """
+    return {
+        category: {
+            sys.intern(canonical): tuple(k.lower() for k in keywords if isinstance(k, str))
+            for canonical, keywords in section.items()
+        }
+        for category, section in mappings.items()
+        if isinstance(section, dict)
+    }
+
+_MINIMAL_KEYWORD_MAPPINGS = _normalize_keyword_mappings(_MINIMAL_KEYWORD_MAPPINGS)
+
+# Connection pool for the OpenAI HTTP clients, shared by every provider in the process
+HTTP_POOL_LIMITS = httpx.Limits(max_keepalive_connections=50, max_connections=100)
+HTTP_TIMEOUT = httpx.Timeout(60.0)
+
+# Persistent LLM result cache location (absolute, so it does not follow the working directory)
+# and entry lifetime (30 days)
+LLM_CACHE_DIR = os.path.abspath(
+    os.getenv("LLM_CACHE_DIR") or os.path.join(os.path.dirname(os.path.dirname(__file__)), ".llm_cache")
+)
+DISK_CACHE_TTL_S = 30 * 24 * 3600
+
+# Upper bound on in-flight requests for the async fan-out helpers
+MAX_CONCURRENT_REQUESTS = 8
+
+# How long aget_fallback_value waits for other requests to share one batched completion
+FALLBACK_BATCH_WINDOW_S = 0.005
+
+# Year mention, optionally preceded by "by" or "in"
+_YEAR_RE = re.compile(r"\b(?:by\s+|in\s+)?(20\d{2})\b")
+
+# First (optionally negative, optionally decimal) number in an LLM response
+_NUM_RE = re.compile(r"-?\d+\.?\d*")
+
+# Everything except digits and decimal points, for the aggressive number fallback
+_DIGITS_STRIP_RE = re.compile(r"[^\d.]")
+
+# Outermost JSON array in an LLM response
+_JSON_ARRAY_RE = re.compile(r"\[[\s\S]*\]")
+
+class _JsonObjectScanner:
+    """Incrementally tracks brace depth of streamed text to find where the first JSON object ends"""
+    __slots__ = ("depth", "in_string", "escaped", "started")
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.started = False
+
+    def feed(self, chunk: str) -> int:
+        """
+        Scan the next chunk of text.
+        
+        Args:
+            chunk: Next piece of the streamed response
+            
+        Returns:
+            Index in chunk just past the closing brace of the first object, or -1
+        """
+        for i, ch in enumerate(chunk):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                if self.started:
+                    self.in_string = True
+            elif ch == "{":
+                self.depth += 1
+                self.started = True
+            elif ch == "}" and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    return i + 1
+        return -1
+
+# System prompt for parse_nfg_intent
+_NFG_INTENT_SYSTEM_PROMPT = """
+You are an energy analytics assistant specialized in Networks-Fuels-Generation (NFG) queries.
+
+Your task is to extract structured information from user queries about energy metrics.
+
+IMPORTANT: You must return ONLY a valid JSON object with these fields:
+- metric: The canonical metric name (e.g., LCOE, GENERATION_GWh, CAPACITY_MW, CAPACITY_FACTOR, EMISSIONS_tCO2)
+- tech: The technology type (e.g., NUCLEAR, CCGT, WIND, SOLAR, PV, HYDRO)
+- country: The country code (e.g., BE, FR, ES, DE, IT, UK)
+- year: The year as integer (e.g., 2030, 2040, 2050)
+- fuel: Optional fuel type (e.g., GAS, COAL, URANIUM)
+- network: Optional network type (e.g., TRANSMISSION, DISTRIBUTION)
+- operation: Optional operation (avg, sum, min, max)
+
+Include confidence scores (0.0-1.0) for each field in a nested "confidence" object.
+
+Example of valid response format:
+{
+  "metric": "LCOE",
+  "tech": "NUCLEAR",
+  "country": "BE",
+  "year": 2050,
+  "fuel": null,
+  "network": null,
+  "operation": null,
+  "confidence": {
+    "metric": 0.95,
+    "tech": 0.9,
+    "country": 0.8,
+    "year": 0.99
+  }
+}
+
+MAKE SURE your response contains only the JSON object, nothing else.
+"""
+
+# System prompt for parse_nfg_intents_batch: the single-query fields, one object per query
+_NFG_INTENT_BATCH_SYSTEM_PROMPT = """
+You are an energy analytics assistant specialized in Networks-Fuels-Generation (NFG) queries.
+
+Your task is to extract structured information from each of several user queries about energy metrics.
+
+For every query return an object with its "id" and these fields (null when not mentioned):
+- metric: The canonical metric name (e.g., LCOE, GENERATION_GWh, CAPACITY_MW, CAPACITY_FACTOR, EMISSIONS_tCO2)
+- tech: The technology type (e.g., NUCLEAR, CCGT, WIND, SOLAR, PV, HYDRO)
+- country: The country code (e.g., BE, FR, ES, DE, IT, UK)
+- year: The year as integer (e.g., 2030, 2040, 2050)
+- fuel: Optional fuel type (e.g., GAS, COAL, URANIUM)
+- network: Optional network type (e.g., TRANSMISSION, DISTRIBUTION)
+- operation: Optional operation (avg, sum, min, max)
+
+Include confidence scores (0.0-1.0) for each field in a nested "confidence" object.
+
+MAKE SURE your response contains only a JSON array with one object per query, nothing else.
+"""
+
+# Structured-output schema for parse_nfg_intent; strict mode needs every field listed as required
+_NULLABLE_STRING = {"type": ["string", "null"]}
+_INTENT_FIELDS = ("metric", "tech", "country", "year", "fuel", "network", "operation")
+_NFG_INTENT_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "nfg_intent",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "metric": _NULLABLE_STRING,
+                "tech": _NULLABLE_STRING,
+                "country": _NULLABLE_STRING,
+                "year": {"type": ["integer", "null"]},
+                "fuel": _NULLABLE_STRING,
+                "network": _NULLABLE_STRING,
+                "operation": _NULLABLE_STRING,
+                "confidence": {
+                    "type": "object",
+                    "properties": {field: {"type": ["number", "null"]} for field in _INTENT_FIELDS},
+                    "required": list(_INTENT_FIELDS),
+                    "additionalProperties": False
+                }
+            },
+            "required": list(_INTENT_FIELDS) + ["confidence"],
+            "additionalProperties": False
+        }
+    }
+}
+
+# System prompt for determine_equation
+_EQUATION_SYSTEM_PROMPT = """
+You are an energy analytics expert specialized in NFG (Networks-Fuels-Generation) mathematics.
+Provide the equation for calculating the given metric.
+Return ONLY a valid JSON object with:
+- formula: mathematical formula as string using only basic math operators (+, -, *, /, sum)
+- required: array of required variable names
+- unit: unit of measure for result
+
+IMPORTANT: The formula must be simple enough to be parsed by SymPy. 
+For sum operations, use "sum([VAR])" instead of complex notations like "SUM(VAR_i for i=1..N)".
+For CAPACITY_MW, use "UNIT_CAPACITY_MW" as the variable name.
+
+Example:
+{
+  "formula": "TOTAL_GEN_COST_kUSD / GENERATION_GWh",
+  "required": ["TOTAL_GEN_COST_kUSD", "GENERATION_GWh"],
+  "unit": "USD/MWh"
+}
+"""
+
+# Result of determine_equation when no equation could be determined (read-only, shared)
+_EMPTY_EQUATION = MappingProxyType({"formula": None, "unit": None, "required": ()})
+
+# System prompt for get_variable_mapping
+_VAR_MAPPING_SYSTEM_PROMPT = """
+You are an energy analytics expert specialized in NFG (Networks-Fuels-Generation) data.
+Map the canonical variable to possible properties from the available list.
+Return ONLY a valid JSON array with objects containing:
+- property_name: exact name from available_properties that could match
+- unit_name: expected unit of measure
+- transform: description of any transform needed
+
+Return empty array if no matches found.
+"""
+
+# System prompt for get_variable_mappings_bulk
+_VAR_MAPPING_BULK_SYSTEM_PROMPT = """
+You are an energy analytics expert specialized in NFG (Networks-Fuels-Generation) data.
+Map each canonical variable to possible properties from the available list.
+Return ONLY a valid JSON object keyed by canonical variable, where each value is an array of objects containing:
+- property_name: exact name from available_properties that could match
+- unit_name: expected unit of measure
+- transform: description of any transform needed
+
+Use an empty array for variables with no matches.
+"""
+
+# Patterns used by extract_json_from_response
+_RE_JSON_BLOCK = re.compile(r'```json\s*([\s\S]*?)\s*```')
+_RE_CODE_BLOCK = re.compile(r'```\s*([\s\S]*?)\s*```')
+_RE_UNQUOTED = re.compile(r'([{,])\s*(\w+):')
+# Stdlib decoder for raw_decode: parses the first JSON value and ignores trailing text
+_JSON_DECODER = json.JSONDecoder()
+
+def _find_balanced(text: str, open_ch: str, close_ch: str) -> Optional[str]:
+    """
+    Slice out the first balanced open_ch...close_ch span with one linear scan,
+    ignoring brackets inside double-quoted strings.
+    
+    Args:
+        text: Text to search
+        open_ch: Opening bracket ("{" or "[")
+        close_ch: Matching closing bracket
+        
+    Returns:
+        The balanced span, or None if there is none
+    """
+    start = text.find(open_ch)
+    if start < 0:
+        return None
+    
+    depth = 0
+    in_str = False
+    esc = False
+    for i in range(start, len(text)):
+        c = text[i]
+        if in_str:
+            if esc:
+                esc = False
+            elif c == "\\":
+                esc = True
+            elif c == '"':
+                in_str = False
+        elif c == '"':
+            in_str = True
+        elif c == open_ch:
+            depth += 1
+        elif c == close_ch:
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+def extract_json_from_response(response_text: str) -> Union[Dict, List, None]:
+    """
+    Extract JSON from an LLM response with robust error handling.
+    
+    Args:
+        response_text: The raw text response from the LLM
+        
+    Returns:
+        Parsed JSON object or None if parsing failed
+    """
+    # Clean the response text
+    text = response_text.strip()
+    
+    # JSON-mode responses parse directly, without any regex scans; if text follows
+    # the value, raw_decode stops at its end so the trailing text does not fail the parse
+    if text[:1] in ("{", "["):
+        try:
+            return _json_loads(text)
+        except json.JSONDecodeError:
+            pass
+        try:
+            return _JSON_DECODER.raw_decode(text)[0]
+        except json.JSONDecodeError:
+            pass
+    
+    # Try to find JSON with code block markers
+    if "```json" in text:
+        # Extract content between ```json and ```
+        match = _RE_JSON_BLOCK.search(text)
+        if match:
+            text = match.group(1).strip()
+    elif "```" in text:
+        # Extract content between ``` and ```
+        match = _RE_CODE_BLOCK.search(text)
+        if match:
+            text = match.group(1).strip()
+    
+    # Try to find a JSON object in the text, then an array
+    json_str = _find_balanced(text, "{", "}") or _find_balanced(text, "[", "]")
+    
+    if json_str:
+        try:
+            return _json_loads(json_str)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Failed to parse JSON: {e}")
+            
+            # Try to fix common JSON formatting issues
+            try:
+                # Replace single quotes with double quotes
+                fixed_str = json_str.replace("'", '"')
+                return _json_loads(fixed_str)
+            except json.JSONDecodeError:
+                pass
+                
+            # Try more aggressive fixes
+            try:
+                # Fix unquoted keys
+                fixed_str = _RE_UNQUOTED.sub(r'\1"\2":', json_str)
+                return _json_loads(fixed_str)
+            except json.JSONDecodeError:
+                logger.warning("Failed to fix and parse JSON after multiple attempts")
+    
+    logger.warning(f"No valid JSON found in response: {response_text[:100]}...")
+    return None
+
+# Prompts for each mapping section: (task description, request)
+_MAPPING_PROMPTS = {
+    "tech": ("""Provide mappings between canonical technology names and patterns that might appear in CSV files.
+Respond with a JSON dictionary where keys are canonical names and values are lists of pattern strings.""",
+             """Please provide mappings between these canonical technology names and patterns:
+- NUCLEAR
+- WIND
+- SOLAR
+- HYDRO
+- CCGT
+- COAL
+- OIL
+- BIOMASS
+- GEOTHERMAL
+
+For example, "NUCLEAR" might map to ["Nuclear", "nuclear power", "nuclear energy"]."""),
+    "country": ("""Provide mappings between canonical country codes and codes that might appear in CSV files.
+Respond with a JSON dictionary where keys are canonical codes and values are codes in CSV.""",
+                """Please provide mappings between these canonical country codes and codes in CSV:
+- BE (Belgium)
+- FR (France)
+- DE (Germany)
+- UK (United Kingdom)
+- ES (Spain)
+- IT (Italy)
+- NL (Netherlands)
+- PL (Poland)
+- PT (Portugal)
+- NO (Norway)"""),
+    "metric": ("""Provide information about energy system metrics including full names, formatting specifications, and descriptions.
+Respond with a JSON dictionary where keys are metric names and values are dictionaries with full_name, format, and description.""",
+               """Please provide information about these metrics:
+- LCOE
+- CAPACITY_FACTOR
+- EMISSIONS_INTENSITY
+- CAPEX
+- OPEX
+- TOTAL_GEN_COST
+- CAPACITY_VALUE
+
+Each metric should have:
+1. full_name: The full name of the metric
+2. format: A Python format string like "{:.2f}" for 2 decimal places or "{:.1%}" for percentage
+3. description: A brief description of what the metric means"""),
+    "property": ("""Provide mappings between canonical variable names and property names that might appear in CSV files.
+Respond with a JSON dictionary where keys are canonical variable names and values are lists of property names.""",
+                 """Please provide mappings between these canonical variable names and property names in CSV:
+- TOTAL_GEN_COST_kUSD
+- GENERATION_GWh
+- CAPACITY_MW
+- CAPEX_USD_per_kW
+- OPEX_FIXED_USD_per_kWyr
+- OPEX_VAR_USD_per_MWh
+- EMISSIONS_tCO2
+- HEAT_RATE_BTU_per_kWh
+- FUEL_PRICE_USD_per_MMBTU
+- CF_PERCENT
+
+For example, "TOTAL_GEN_COST_kUSD" might map to ["Total Generation Cost", "Generation Cost", "Total Cost"]."""),
+}
+
+# One prompt answering every section under its own key, so the four mappings cost a single round-trip
+_ALL_MAPPINGS_PROMPT = (
+    "You are an energy systems expert.\n"
+    'Return ONLY a JSON object with the keys "tech", "country", "metric" and "property", '
+    "answering each task below under its key. No explanation.\n\n"
+    + "\n\n".join(f"### {key}\n{task}\n\n{request}" for key, (task, request) in _MAPPING_PROMPTS.items())
+)
+
+@functools.lru_cache(maxsize=8)
+def _get_encoding(model: str):
+    """
+    Load the tiktoken encoder for a model once per process.
+    
+    Args:
+        model: Model name
+        
+    Returns:
+        tiktoken Encoding for the model's family
+    """
+    # Different encoding models for different OpenAI model families
+    if model.startswith("gpt-4"):
+        return tiktoken.encoding_for_model("gpt-4")
+    elif model.startswith("gpt-3.5"):
+        return tiktoken.encoding_for_model("gpt-3.5-turbo")
+    # gpt-5 and other models use cl100k_base
+    return tiktoken.get_encoding("cl100k_base")
+
+@functools.lru_cache(maxsize=None)
+def _get_disk_cache(directory: str) -> DiskCache:
+    """
+    Open the persistent cache for a directory once per process.
+    The connection is closed at interpreter exit.
+    
+    Args:
+        directory: Absolute cache directory
+        
+    Returns:
+        DiskCache shared by every provider using that directory
+    """
+    cache = DiskCache(directory)
+    atexit.register(cache.close)
+    return cache
+
+@functools.lru_cache(maxsize=None)
+def _get_http_clients() -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """
+    Create the pooled HTTP clients once per process.
+    The sync pool is closed at interpreter exit; the async pool's sockets are released with the process.
+    
+    Returns:
+        (sync client, async client) shared by every provider
+    """
+    http = httpx.Client(limits=HTTP_POOL_LIMITS, timeout=HTTP_TIMEOUT, http2=_HTTP2_AVAILABLE)
+    ahttp = httpx.AsyncClient(limits=HTTP_POOL_LIMITS, timeout=HTTP_TIMEOUT, http2=_HTTP2_AVAILABLE)
+    atexit.register(http.close)
+    return http, ahttp
+
 class LLMProvider:
+    # Shared by every instance so providers created per request start warm
+    metrics: ClassVar[Metrics] = Metrics()
+    value_cache: ClassVar[Dict[Tuple, float]] = {}
+    _keyword_cache: ClassVar[Dict[Any, Any]] = {}
+    _cache_lock: ClassVar[threading.Lock] = threading.Lock()
+    # Robust JSON extraction, also available as a method for callers holding a provider
+    extract_json_from_response = staticmethod(extract_json_from_response)
+    
     def __init__(self, api_key: str = None, model: str = "gpt-3.5-turbo"):
         """
         Initialize LLM provider with API key and model.
@@ -36,9 +561,6 @@ class LLMProvider:
             api_key: Optional API key (will use environment variable if not provided)
             model: Model name to use for completions
         """
-        # Initialize metrics tracker
-        self.metrics = Metrics()
-        
         # Use environment variable if no API key provided
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         
@@ -49,23 +571,17 @@ class LLMProvider:
         self.model = model
         # Store model family for parameter handling
         self.model_family = ModelConfig.get_model_family(model)
+        # Checked on every request, so resolve it once
+        self._supports_temperature = ModelConfig.supports_temperature(model)
         
-        # Initialize token encoder for counting
+        # Initialize token encoder for counting (shared between instances)
         try:
-            # Different encoding models for different OpenAI model families
-            if model.startswith("gpt-4"):
-                self.encoding = tiktoken.encoding_for_model("gpt-4")
-            elif model.startswith("gpt-3.5"):
-                self.encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
-            elif model.startswith("gpt-5"):
-                # Use cl100k_base for gpt-5 models
-                self.encoding = tiktoken.get_encoding("cl100k_base")
-            else:
-                # Default encoding
-                self.encoding = tiktoken.get_encoding("cl100k_base")
+            self.encoding = _get_encoding(model)
         except Exception as e:
             logger.warning(f"Failed to initialize token encoder: {str(e)}")
             self.encoding = None
+            # Without an encoder every count is the approximation; bind it directly
+            self.count_tokens = self.count_tokens_fast
             
         # Set token limits based on model (for logging/monitoring only)
         self.token_limits = {
@@ -91,12 +607,25 @@ class LLMProvider:
         
         # Initialize OpenAI client based on API version
         if OPENAI_NEW_API:
-            self.client = OpenAI(api_key=self.api_key)
+            # Process-wide pooled clients keep warm connections between calls and providers
+            http, ahttp = _get_http_clients()
+            self.client = OpenAI(api_key=self.api_key, http_client=http)
+            self.aclient = AsyncOpenAI(api_key=self.api_key, http_client=ahttp)
         else:
             openai.api_key = self.api_key
             
-        # In-memory cache for value predictions - no YAML dependency
-        self.value_cache = {}
+        # Single-entry fast paths for the most recent value lookup and regex fallback
+        self._last_value_key = None
+        self._last_value = None
+        self._last_intent_text = None
+        self._last_intent_result = None
+        
+        # Persistent cache so LLM results survive restarts and are shared between workers
+        self._disk = _get_disk_cache(LLM_CACHE_DIR)
+        
+        # Pending (canonical_var, filters, future) entries for the async micro-batcher
+        self._fallback_queue = []
+        self._fallback_flush = None
     
     def get_fallback_value(self, canonical_var: str, filters: Dict[str, Any] = None) -> float:
         """
@@ -115,38 +644,20 @@ class LLMProvider:
             return None
         
         # Create a cache key based on variable and filters
-        cache_key = f"{canonical_var}_{filters.get('tech', '')}{filters.get('country', '')}{filters.get('year', '')}"
+        cache_key = self._fallback_cache_key(canonical_var, filters)
         
-        # Check if we already have this value cached in memory
-        if cache_key in self.value_cache:
-            return self.value_cache[cache_key]
+        # Check if we already have this value cached in memory or on disk
+        cached = self._get_cached_value(cache_key)
+        if cached is not None:
+            return cached
         
         # Always use LLM to determine values dynamically
         try:
-            # Create a prompt asking for a reasonable value
-            country_str = f" in {filters.get('country', 'a typical country')}" if filters and "country" in filters else ""
-            year_str = f" for {filters.get('year', 'current year')}" if filters and "year" in filters else ""
-            tech_str = f" for {filters.get('tech', 'typical generation technology')}" if filters and "tech" in filters else ""
-            
-            system_prompt = f"""You are an energy systems expert. Provide a single numeric value for the requested energy system parameter.
-Respond ONLY with the numeric value, no text explanation or unit."""
-
-            user_prompt = f"""What is a typical value for {canonical_var}{tech_str}{country_str}{year_str}?
-Remember to respond ONLY with the numeric value."""
+            system_prompt, user_prompt = self._fallback_value_prompts(canonical_var, filters)
 
             # Make an API call to get a reasonable value
             response_text = self.generate_completion(system_prompt, user_prompt)
-            
-            # Extract numeric value from response
-            value_match = re.search(r'-?\d+\.?\d*', response_text.strip())
-            if value_match:
-                try:
-                    value = float(value_match.group(0))
-                    # Cache the result for future use
-                    self.value_cache[cache_key] = value
-                    return value
-                except ValueError:
-                    pass
+            return self._cache_fallback_value(cache_key, response_text)
             
         except Exception as e:
             logger.error(f"Error getting fallback from LLM for {canonical_var}: {str(e)}")
@@ -155,6 +666,223 @@ Remember to respond ONLY with the numeric value."""
         # Return None - will fall back to guess_reasonable_value
         return None
     
+    async def aget_fallback_value(self, canonical_var: str, filters: Dict[str, Any] = None) -> Optional[float]:
+        """
+        Async counterpart of get_fallback_value using the async client.
+        Requests made within FALLBACK_BATCH_WINDOW_S of each other are coalesced
+        into a single batched completion.
+        
+        Args:
+            canonical_var: Canonical variable name
+            filters: Optional filters like tech, country, year
+            
+        Returns:
+            A reasonable fallback value, or None if the LLM gave no usable number
+        """
+        if not self.api_key:
+            logger.warning("No API key available for getting fallback value.")
+            return None
+        
+        cache_key = self._fallback_cache_key(canonical_var, filters)
+        cached = self._get_cached_value(cache_key)
+        if cached is not None:
+            return cached
+        
+        future = asyncio.get_running_loop().create_future()
+        self._fallback_queue.append((canonical_var, filters, future))
+        if self._fallback_flush is None:
+            self._fallback_flush = asyncio.create_task(self._flush_fallback_queue())
+        return await future
+    
+    async def _flush_fallback_queue(self) -> None:
+        """Wait for the batching window, then resolve every queued fallback request"""
+        await asyncio.sleep(FALLBACK_BATCH_WINDOW_S)
+        pending, self._fallback_queue, self._fallback_flush = self._fallback_queue, [], None
+        
+        try:
+            if len(pending) == 1:
+                canonical_var, filters, _ = pending[0]
+                system_prompt, user_prompt = self._fallback_value_prompts(canonical_var, filters)
+                response_text = await self.agenerate_completion(system_prompt, user_prompt)
+                values = [self._cache_fallback_value(self._fallback_cache_key(canonical_var, filters), response_text)]
+            else:
+                values = await self.aget_fallback_values_batch([(var, filters) for var, filters, _ in pending])
+        except Exception as e:
+            logger.error(f"Error getting batched fallbacks from LLM: {str(e)}")
+            values = [None] * len(pending)
+        
+        for (_, _, future), value in zip(pending, values):
+            if not future.done():
+                future.set_result(value)
+    
+    async def aget_fallback_values(self, items: List[Tuple[str, Dict[str, Any]]],
+                                   max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS) -> List[Optional[float]]:
+        """
+        Get fallback values for several variables concurrently.
+        
+        Args:
+            items: (canonical_var, filters) pairs
+            max_concurrent_requests: Maximum number of LLM requests in flight
+            
+        Returns:
+            Fallback values in the same order as items, None where the lookup failed
+        """
+        semaphore = asyncio.Semaphore(max_concurrent_requests)
+        
+        async def fetch(canonical_var: str, filters: Dict[str, Any]) -> Optional[float]:
+            async with semaphore:
+                return await self.aget_fallback_value(canonical_var, filters)
+        
+        results = await asyncio.gather(*(fetch(var, filters) for var, filters in items),
+                                       return_exceptions=True)
+        return [None if isinstance(result, BaseException) else result for result in results]
+    
+    def get_fallback_values_batch(self, items: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[float]]:
+        """
+        Get fallback values for several variables with a single LLM completion.
+        
+        Args:
+            items: (canonical_var, filters) pairs
+            
+        Returns:
+            Fallback values in the same order as items, None where no value was returned
+        """
+        if not self.api_key:
+            logger.warning("No API key available for getting fallback values.")
+            return [None] * len(items)
+        
+        keys = [self._fallback_cache_key(var, filters) for var, filters in items]
+        misses = [i for i, key in enumerate(keys) if self._get_cached_value(key) is None]
+        if misses:
+            try:
+                system_prompt, user_prompt = self._fallback_batch_prompts([items[i] for i in misses])
+                response_text = self.generate_completion(system_prompt, user_prompt)
+                self._cache_fallback_batch([keys[i] for i in misses], response_text)
+            except Exception as e:
+                logger.error(f"Error getting batched fallbacks from LLM: {str(e)}")
+        
+        return [self._get_cached_value(key) for key in keys]
+    
+    async def aget_fallback_values_batch(self, items: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[float]]:
+        """
+        Async counterpart of get_fallback_values_batch.
+        
+        Args:
+            items: (canonical_var, filters) pairs
+            
+        Returns:
+            Fallback values in the same order as items, None where no value was returned
+        """
+        if not self.api_key:
+            logger.warning("No API key available for getting fallback values.")
+            return [None] * len(items)
+        
+        keys = [self._fallback_cache_key(var, filters) for var, filters in items]
+        misses = [i for i, key in enumerate(keys) if self._get_cached_value(key) is None]
+        if misses:
+            try:
+                system_prompt, user_prompt = self._fallback_batch_prompts([items[i] for i in misses])
+                response_text = await self.agenerate_completion(system_prompt, user_prompt)
+                self._cache_fallback_batch([keys[i] for i in misses], response_text)
+            except Exception as e:
+                logger.error(f"Error getting batched fallbacks from LLM: {str(e)}")
+        
+        return [self._get_cached_value(key) for key in keys]
+    
+    def _fallback_batch_prompts(self, items: List[Tuple[str, Dict[str, Any]]]) -> Tuple[str, str]:
+        """Build prompts asking for typical values of several variables as one JSON array"""
+        records = []
+        for i, (canonical_var, filters) in enumerate(items):
+            filters = filters or {}
+            records.append({
+                "id": i,
+                "canonical_var": canonical_var,
+                "tech": filters.get("tech"),
+                "country": filters.get("country"),
+                "year": filters.get("year")
+            })
+        
+        system_prompt = """You are an energy systems expert. For each requested energy system parameter provide a single typical numeric value.
+Respond ONLY with a JSON array of objects {"id": <id>, "value": <number>}, one per request, no text explanation or unit."""
+
+        user_prompt = f"""What are typical values for these parameters (null fields mean typical/any)?
+{json.dumps(records)}"""
+        
+        return system_prompt, user_prompt
+    
+    def _cache_fallback_batch(self, keys: List[Tuple], response_text: str) -> None:
+        """Parse a batched [{id, value}, ...] response and cache every usable value"""
+        array_match = _JSON_ARRAY_RE.search(response_text)
+        if not array_match:
+            logger.warning(f"No JSON array in batched fallback response: {response_text[:100]}")
+            return
+        
+        for entry in _json_loads(array_match.group(0)):
+            try:
+                index = int(entry["id"])
+                value = float(entry["value"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if 0 <= index < len(keys):
+                self._store_value(keys[index], value)
+    
+    def _get_cached_value(self, cache_key: Tuple) -> Optional[float]:
+        """Look up a value in memory, then on disk (promoting disk hits to memory)"""
+        # Repeated lookups of the same key skip hashing entirely
+        if cache_key == self._last_value_key:
+            return self._last_value
+        
+        # Shared by every provider, so keyed by model like the disk tier
+        value = self.value_cache.get((self.model, cache_key))
+        if value is None:
+            value = self._disk.get(DiskCache.make_key("value", self.model, cache_key))
+            if value is None:
+                return None
+            with self._cache_lock:
+                self.value_cache[(self.model, cache_key)] = value
+        
+        self._last_value_key, self._last_value = cache_key, value
+        return value
+    
+    def _store_value(self, cache_key: Tuple, value: float) -> None:
+        """Cache an LLM-provided value in memory and on disk"""
+        with self._cache_lock:
+            self.value_cache[(self.model, cache_key)] = value
+        self._last_value_key, self._last_value = cache_key, value
+        self._disk.set(DiskCache.make_key("value", self.model, cache_key), value, expire=DISK_CACHE_TTL_S)
+    
+    def _fallback_cache_key(self, canonical_var: str, filters: Dict[str, Any] = None) -> Tuple:
+        """Cache key for a fallback value of a variable under the given filters"""
+        filters = filters or {}
+        return (canonical_var, filters.get('tech'), filters.get('country'), filters.get('year'))
+    
+    def _fallback_value_prompts(self, canonical_var: str, filters: Dict[str, Any] = None) -> Tuple[str, str]:
+        """Build the system and user prompts asking for a typical value of a variable"""
+        country_str = f" in {filters.get('country', 'a typical country')}" if filters and "country" in filters else ""
+        year_str = f" for {filters.get('year', 'current year')}" if filters and "year" in filters else ""
+        tech_str = f" for {filters.get('tech', 'typical generation technology')}" if filters and "tech" in filters else ""
+        
+        system_prompt = f"""You are an energy systems expert. Provide a single numeric value for the requested energy system parameter.
+Respond ONLY with the numeric value, no text explanation or unit."""
+
+        user_prompt = f"""What is a typical value for {canonical_var}{tech_str}{country_str}{year_str}?
+Remember to respond ONLY with the numeric value."""
+        
+        return system_prompt, user_prompt
+    
+    def _cache_fallback_value(self, cache_key: Tuple, response_text: str) -> Optional[float]:
+        """Extract the numeric value from an LLM response and cache it"""
+        value_match = _NUM_RE.search(response_text.strip())
+        if value_match:
+            try:
+                value = float(value_match.group(0))
+                # Cache the result for future use
+                self._store_value(cache_key, value)
+                return value
+            except ValueError:
+                pass
+        return None
+    
     def _enhanced_regex_fallback(self, text: str) -> Dict[str, Any]:
         """
         Enhanced regex-based fallback for intent parsing when LLM fails.
@@ -168,6 +896,10 @@ Remember to respond ONLY with the numeric value."""
         """
         logger.info(f"Using enhanced regex fallback for intent parsing: {text}")
         
+        # Same query as last time (and the keyword mappings have not changed since)
+        if text == self._last_intent_text:
+            return self._copy_intent(self._last_intent_result)
+        
         # Initialize result structure
         result = {
             "metric": None, "tech": None, "fuel": None, "network": None, 
@@ -181,86 +913,73 @@ Remember to respond ONLY with the numeric value."""
             try:
                 # Dynamically generate keyword mappings
                 keywords_map = self._generate_keyword_mappings()
-                
-                # Get metrics, technologies and countries from LLM response
-                metrics = keywords_map.get("metrics", {})
-                technologies = keywords_map.get("technologies", {})
-                countries = keywords_map.get("countries", {})
-                
             except Exception as e:
                 logger.error(f"Error generating keywords from LLM: {str(e)}")
-                # Minimal fallback with just the most common keywords
-                metrics = {
-                    "LCOE": ["lcoe", "levelized cost"],
-                    "NPV": ["npv", "net present value"],
-                    "CAPACITY_FACTOR": ["capacity factor", "cf"]
-                }
-                technologies = {
-                    "NUCLEAR": ["nuclear"],
-                    "WIND": ["wind"],
-                    "SOLAR": ["solar"]
-                }
-                countries = {
-                    "BE": ["belgium", "belgian"],
-                    "FR": ["france", "french"],
-                    "UK": ["uk", "united kingdom"]
-                }
+                keywords_map = _MINIMAL_KEYWORD_MAPPINGS
         else:
             # Minimal fallback with just the most common keywords if no LLM
-            metrics = {
-                "LCOE": ["lcoe", "levelized cost"],
-                "NPV": ["npv", "net present value"],
-                "CAPACITY_FACTOR": ["capacity factor", "cf"]
-            }
-            technologies = {
-                "NUCLEAR": ["nuclear"],
-                "WIND": ["wind"],
-                "SOLAR": ["solar"]
-            }
-            countries = {
-                "BE": ["belgium", "belgian"],
-                "FR": ["france", "french"],
-                "UK": ["uk", "united kingdom"]
-            }
-        
-        # Process metrics
-        for metric_name, keywords in metrics.items():
-            if any(keyword in text_lower for keyword in keywords):
-                result["metric"] = metric_name
-                result["confidence"]["metric"] = 0.8
-                break
-        
-        # Process technologies
-        for tech_name, keywords in technologies.items():
-            if any(keyword in text_lower for keyword in keywords):
-                result["tech"] = tech_name
-                result["confidence"]["tech"] = 0.8
-                break
+            keywords_map = _MINIMAL_KEYWORD_MAPPINGS
         
-        # Process countries
-        for code, keywords in countries.items():
-            if any(keyword in text_lower for keyword in keywords):
-                result["country"] = code
-                result["confidence"]["country"] = 0.8
-                break
+        automaton = self._get_keyword_automaton(keywords_map)
+        if automaton is not None:
+            # One pass over the text for every keyword; first hit per field wins
+            for _, (field, canonical) in automaton.iter(text_lower):
+                if result[field] is None:
+                    result[field] = canonical
+                    result["confidence"][field] = 0.8
+        else:
+            for category, field in _KEYWORD_CATEGORIES:
+                for canonical, keywords in keywords_map.get(category, {}).items():
+                    if any(keyword in text_lower for keyword in keywords):
+                        result[field] = canonical
+                        result["confidence"][field] = 0.8
+                        break
         
-        # Year extraction - improved to handle "by 2050" and similar phrases
-        year_patterns = [
-            r"(20\d{2})",  # Standard year
-            r"by\s+(20\d{2})",  # "by 2050"
-            r"in\s+(20\d{2})"   # "in 2050"
-        ]
+        # Year extraction - handles "2050", "by 2050" and "in 2050" in one pass
+        year_match = _YEAR_RE.search(text)
+        if year_match:
+            result["year"] = int(year_match.group(1))
+            result["confidence"]["year"] = 0.9
         
-        for pattern in year_patterns:
-            year_match = re.search(pattern, text)
-            if year_match:
-                # Extract the actual year digits regardless of pattern
-                year_str = re.search(r"20\d{2}", year_match.group(0)).group(0)
-                result["year"] = int(year_str)
-                result["confidence"]["year"] = 0.9
-                break
-                
+        self._last_intent_text, self._last_intent_result = text, self._copy_intent(result)
         return result
+    
+    @staticmethod
+    def _copy_intent(intent: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy an intent so callers can mutate it (and its confidence dict) freely"""
+        return {**intent, "confidence": dict(intent["confidence"])}
+
+    def _get_keyword_automaton(self, keywords_map: Dict[str, Dict[str, Tuple[str, ...]]]):
+        """
+        Build (once per keyword mapping) an Aho-Corasick automaton over all keywords.
+        
+        Args:
+            keywords_map: Mapping with "metrics", "technologies" and "countries" sections
+            
+        Returns:
+            ahocorasick.Automaton yielding (field, canonical) values, or None if
+            pyahocorasick is not installed
+        """
+        if ahocorasick is None:
+            return None
+        
+        # The automaton is cached alongside the mapping it was built from
+        cached = self._keyword_cache.get(("keyword_automaton", self.model))
+        if cached is not None and cached[0] is keywords_map:
+            return cached[1]
+        
+        automaton = ahocorasick.Automaton()
+        for category, field in _KEYWORD_CATEGORIES:
+            for canonical, keywords in keywords_map.get(category, {}).items():
+                for keyword in keywords:
+                    # Keep the first canonical value a keyword was listed under
+                    if keyword and keyword not in automaton:
+                        automaton.add_word(keyword, (field, canonical))
+        automaton.make_automaton()
+        
+        with self._cache_lock:
+            self._keyword_cache[("keyword_automaton", self.model)] = (keywords_map, automaton)
+        return automaton
 
     def count_tokens(self, text: str) -> int:
         """
@@ -272,17 +991,29 @@ Remember to respond ONLY with the numeric value."""
         Returns:
             Number of tokens in the text
         """
-        if self.encoding is None:
-            # Rough approximation if no encoder is available
-            return len(text) // 4
-        
+        # Instances without an encoder rebind count_tokens to count_tokens_fast in __init__.
+        # Special-token text is counted as plain text rather than raising and falling back
         try:
-            tokens = self.encoding.encode(text)
-            return len(tokens)
+            return len(self.encoding.encode(text, disallowed_special=()))
         except Exception as e:
             logger.warning(f"Error counting tokens: {str(e)}")
             # Fallback to rough approximation
-            return len(text) // 4
+            return self.count_tokens_fast(text)
+            
+    @staticmethod
+    def count_tokens_fast(text: str) -> int:
+        """
+        Estimate the number of tokens in a text string without encoding it.
+        Uses the ~4 characters per token rule of thumb; use count_tokens when
+        an exact count is required (e.g. checking against the context window).
+        
+        Args:
+            text: Text to estimate tokens for
+            
+        Returns:
+            Approximate number of tokens in the text
+        """
+        return len(text) // 4
             
     def get_token_limit_info(self) -> Dict[str, Any]:
         """
@@ -314,18 +1045,18 @@ Remember to respond ONLY with the numeric value."""
             return ""
         
         # Only count tokens for logging/debugging purposes
-        token_count = self.count_tokens(prompt)
-        logger.debug(f"Token count for prompt: {token_count}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Token count for prompt: {self.count_tokens(prompt)}")
         
         # Don't enforce token limits or include them in calls - the API will handle this
         # This allows the model to use its full context window as needed
             
         # Filter out parameters not supported by this model
-        filtered_kwargs = kwargs.copy()
-        from .model_config import ModelConfig
-        if "temperature" in filtered_kwargs and not ModelConfig.supports_temperature(self.model):
+        # Only copy when something has to be removed
+        filtered_kwargs = kwargs
+        if "temperature" in kwargs and not self._supports_temperature:
             logger.info(f"Removing 'temperature' parameter as it's not supported for model {self.model}")
-            del filtered_kwargs["temperature"]
+            filtered_kwargs = {k: v for k, v in kwargs.items() if k != "temperature"}
             
         start_time = time.time()
         
@@ -370,32 +1101,208 @@ Remember to respond ONLY with the numeric value."""
         if not self.api_key:
             logger.warning("No API key provided. Returning empty response.")
             return ""
+        
+        try:
+            return self._chat_completion(system_prompt, user_prompt, **kwargs)
+        except Exception as e:
+            logger.error(f"Error generating completion: {str(e)}")
+            return ""
+    
+    def complete_json(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
+        """
+        Stream a completion that should contain a JSON object and stop reading as
+        soon as the object's closing brace arrives, cancelling any trailing text.
+        API errors propagate so callers can retry them.
+        
+        Args:
+            system_prompt: System prompt to set context
+            user_prompt: User prompt with specific request
+            **kwargs: Additional parameters for the LLM API
+            
+        Returns:
+            Response text up to the end of the first JSON object (the whole response
+            if no complete object was found)
+        """
+        if not OPENAI_NEW_API:
+            return self._chat_completion(system_prompt, user_prompt, **kwargs)
+        
+        # Filter out parameters not supported by this model
+        if "temperature" in kwargs and not self._supports_temperature:
+            kwargs.pop("temperature")
+        
+        start_time = time.time()
+        
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            stream=True,
+            **kwargs
+        )
+        
+        scanner = _JsonObjectScanner()
+        parts = []
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                end = scanner.feed(delta)
+                if end >= 0:
+                    parts.append(delta[:end])
+                    break
+                parts.append(delta)
+        finally:
+            # Closing the stream drops the connection and stops the generation
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+        
+        result = "".join(parts)
+        
+        # Track metrics
+        duration = time.time() - start_time
+        combined_prompt = f"SYSTEM: {system_prompt}\nUSER: {user_prompt}"
+        self.metrics.track_api_call(self.model, combined_prompt, result, duration)
+        
+        return result.strip()
+    
+    def _chat_completion(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
+        """
+        Send a system/user chat request and return the stripped response.
+        Unlike generate_completion, API errors propagate so callers can retry them.
+        
+        Args:
+            system_prompt: System prompt to set context
+            user_prompt: User prompt with specific request
+            **kwargs: Additional parameters for the LLM API
+            
+        Returns:
+            String response from LLM
+        """
+        # Filter out parameters not supported by this model
+        if "temperature" in kwargs and not self._supports_temperature:
+            logger.info(f"Removing 'temperature' parameter as it's not supported for model {self.model}")
+            kwargs.pop("temperature")
+            
+        start_time = time.time()
+        
+        # Create message array with system and user prompts
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        
+        # Use appropriate API based on version
+        if OPENAI_NEW_API:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                **kwargs
+            )
+            result = response.choices[0].message.content
+        else:
+            response = openai.ChatCompletion.create(
+                model=self.model,
+                messages=messages,
+                **kwargs
+            )
+            result = response.choices[0].message.content
+            
+        # Track metrics
+        duration = time.time() - start_time
+        combined_prompt = f"SYSTEM: {system_prompt}\nUSER: {user_prompt}"
+        self.metrics.track_api_call(self.model, combined_prompt, result, duration)
+        
+        return result.strip()
+
+    async def acomplete(self, prompt: str, **kwargs) -> str:
+        """
+        Async counterpart of complete() using the AsyncOpenAI client.
+        
+        Args:
+            prompt: Prompt to send to LLM
+            **kwargs: Additional parameters for the LLM API
+            
+        Returns:
+            String response from LLM
+        """
+        if not OPENAI_NEW_API:
+            # The legacy client has no async API; keep the event loop free
+            return await asyncio.to_thread(self.complete, prompt, **kwargs)
+        
+        if not self.api_key:
+            logger.warning("No API key provided. Returning empty response.")
+            return ""
+        
+        # Only copy when something has to be removed
+        filtered_kwargs = kwargs
+        if "temperature" in kwargs and not self._supports_temperature:
+            logger.info(f"Removing 'temperature' parameter as it's not supported for model {self.model}")
+            filtered_kwargs = {k: v for k, v in kwargs.items() if k != "temperature"}
+            
+        start_time = time.time()
+        
+        try:
+            response = await self.aclient.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                **filtered_kwargs
+            )
+            result = response.choices[0].message.content
+            
+            # Track metrics
+            duration = time.time() - start_time
+            self.metrics.track_api_call(self.model, prompt, result, duration)
+            
+            return result.strip()
+        except Exception as e:
+            logger.error(f"Error calling LLM API: {str(e)}")
+            return ""
+    
+    async def agenerate_completion(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
+        """
+        Async counterpart of generate_completion() using the AsyncOpenAI client.
+        
+        Args:
+            system_prompt: System prompt to set context
+            user_prompt: User prompt with specific request
+            **kwargs: Additional parameters for the LLM API
+            
+        Returns:
+            String response from LLM
+        """
+        if not OPENAI_NEW_API:
+            return await asyncio.to_thread(self.generate_completion, system_prompt, user_prompt, **kwargs)
+        
+        if not self.api_key:
+            logger.warning("No API key provided. Returning empty response.")
+            return ""
+            
+        # Filter out parameters not supported by this model
+        if "temperature" in kwargs and not self._supports_temperature:
+            logger.info(f"Removing 'temperature' parameter as it's not supported for model {self.model}")
+            kwargs.pop("temperature")
             
         start_time = time.time()
         
         try:
-            # Create message array with system and user prompts
             messages = [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ]
+            response = await self.aclient.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                **kwargs
+            )
+            result = response.choices[0].message.content
             
-            # Use appropriate API based on version
-            if OPENAI_NEW_API:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    **kwargs
-                )
-                result = response.choices[0].message.content
-            else:
-                response = openai.ChatCompletion.create(
-                    model=self.model,
-                    messages=messages,
-                    **kwargs
-                )
-                result = response.choices[0].message.content
-                
             # Track metrics
             duration = time.time() - start_time
             combined_prompt = f"SYSTEM: {system_prompt}\nUSER: {user_prompt}"
@@ -406,161 +1313,252 @@ Remember to respond ONLY with the numeric value."""
             logger.error(f"Error generating completion: {str(e)}")
             return ""
 
-    def parse_nfg_intent(self, text: str) -> Dict[str, Any]:
+    def parse_nfg_intent(self, text: str, fallback: bool = True) -> Optional[Dict[str, Any]]:
         """
         Use LLM to extract NFG intent from text.
         No hardcoded dependencies - all parsing done by LLM.
         
         Args:
             text: User query text
+            fallback: Use the regex fallback when the LLM call fails; if False,
+                return None instead so the caller can retry later
             
         Returns:
-            Dict with parsed intent fields
+            Dict with parsed intent fields, or None if the LLM failed and fallback is False
         """
-        system_prompt = """
-        You are an energy analytics assistant specialized in Networks-Fuels-Generation (NFG) queries.
-        
-        Your task is to extract structured information from user queries about energy metrics.
-        
-        IMPORTANT: You must return ONLY a valid JSON object with these fields:
-        - metric: The canonical metric name (e.g., LCOE, GENERATION_GWh, CAPACITY_MW, CAPACITY_FACTOR, EMISSIONS_tCO2)
-        - tech: The technology type (e.g., NUCLEAR, CCGT, WIND, SOLAR, PV, HYDRO)
-        - country: The country code (e.g., BE, FR, ES, DE, IT, UK)
-        - year: The year as integer (e.g., 2030, 2040, 2050)
-        - fuel: Optional fuel type (e.g., GAS, COAL, URANIUM)
-        - network: Optional network type (e.g., TRANSMISSION, DISTRIBUTION)
-        - operation: Optional operation (avg, sum, min, max)
-        
-        Include confidence scores (0.0-1.0) for each field in a nested "confidence" object.
-        
-        Example of valid response format:
-        {
-          "metric": "LCOE",
-          "tech": "NUCLEAR",
-          "country": "BE",
-          "year": 2050,
-          "fuel": null,
-          "network": null,
-          "operation": null,
-          "confidence": {
-            "metric": 0.95,
-            "tech": 0.9,
-            "country": 0.8,
-            "year": 0.99
-          }
-        }
-        
-        MAKE SURE your response contains only the JSON object, nothing else.
-        """
-        
-        # Structure the query for better JSON extraction
-        prompt = f"{system_prompt}\n\nUser Query: \"{text}\"\n\nJSON:"
+        # Structure the query for better JSON extraction; the system prompt goes in
+        # its own message so the identical prefix can hit server-side prompt caching
+        user_prompt = f'User Query: "{text}"\n\nJSON:'
         
         # Log the attempt
         logger.debug(f"Attempting to parse intent from query: {text}")
         
+        if not self.api_key:
+            if not fallback:
+                logger.warning("No API key provided, cannot parse intent with the LLM")
+                return None
+            logger.warning("No API key provided, using enhanced regex fallback")
+            return self._enhanced_regex_fallback(text)
+        
         # No special cases - always use the model for intent parsing
         # This enables true dynamic parsing without hardcoded values
         
-        max_retries = 3
-        for attempt in range(max_retries):
+        # Models with JSON mode / structured outputs return valid JSON on the first call,
+        # so a single request replaces the fence-stripping retries below
+        json_mode = ModelConfig.get_json_mode(self.model)
+        if json_mode is not None:
+            response_format = _NFG_INTENT_RESPONSE_FORMAT if json_mode == "json_schema" else {"type": "json_object"}
+            result = self.generate_completion(_NFG_INTENT_SYSTEM_PROMPT, user_prompt,
+                                              temperature=0.2, response_format=response_format)
+            logger.debug(f"Raw LLM response: {result}")
             try:
-                # Use standard parameters that work across all models
-                # Only set temperature - let the model use its default token limits
-                params = {"temperature": 0.2}
-                
-                result = self.complete(prompt, **params)
-                logger.debug(f"Raw LLM response: {result}")
-                
-                # Try to extract valid JSON
-                # Handle case where there might be markdown formatting
-                result = result.strip()
-                if result.startswith("```json"):
-                    result = result[7:]
-                if result.endswith("```"):
-                    result = result[:-3]
-                
-                # Additional cleanup for common LLM JSON formatting issues
-                result = result.strip()
-                
-                # Debug the cleaned response
-                logger.debug(f"Cleaned response for JSON parsing: {result}")
-                
-                # Try to use our enhanced JSON extraction if it's available
-                try:
-                    # First try to use the enhanced JSON parsing function if it exists
-                    if hasattr(self, 'extract_json_from_response'):
-                        parsed = self.extract_json_from_response(result)
-                        if parsed:
-                            logger.debug(f"Successfully parsed JSON with enhanced extractor: {parsed}")
-                            
-                            # Ensure expected fields exist
-                            for field in ['metric', 'tech', 'country', 'year']:
-                                if field not in parsed:
-                                    parsed[field] = None
-                            if 'confidence' not in parsed:
-                                parsed['confidence'] = {}
-                                
-                            return parsed
-                            
-                    # Fall back to standard JSON parsing
-                    parsed = json.loads(result.strip())
-                    logger.debug(f"Successfully parsed JSON: {parsed}")
-                    
-                    # Ensure expected fields exist
-                    for field in ['metric', 'tech', 'country', 'year']:
-                        if field not in parsed:
-                            parsed[field] = None
-                    if 'confidence' not in parsed:
-                        parsed['confidence'] = {}
-                    
-                    return parsed
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Failed to parse JSON on attempt {attempt+1}. Error: {e}")
-                    logger.warning(f"Problematic JSON string: {result}")
-                    time.sleep(1)  # Wait before retry
-            except Exception as e:
-                logger.error(f"Unexpected error during intent parsing (attempt {attempt+1}): {str(e)}")
-                time.sleep(1)  # Wait before retry
+                parsed = _json_loads(result)
+                if isinstance(parsed, dict):
+                    return self._fill_intent_fields(parsed)
+            except json.JSONDecodeError as e:
+                logger.warning(f"Failed to parse JSON-mode response: {e}")
+            
+            if not fallback:
+                return None
+            logger.warning("LLM intent parsing failed, using enhanced regex fallback")
+            return self._enhanced_regex_fallback(text)
+        
+        try:
+            return self._request_nfg_intent(user_prompt)
+        except Exception as e:
+            logger.warning(f"LLM intent parsing failed: {str(e)}")
                 
+        if not fallback:
+            return None
         # All attempts failed, use enhanced regex-based fallback
         logger.warning("All LLM attempts failed for intent parsing, using enhanced regex fallback")
         return self._enhanced_regex_fallback(text)
 
-    def get_variable_mapping(self, canonical_var: str, available_properties: List[str]) -> List[Dict[str, Any]]:
+    def parse_nfg_intents_batch(self, texts: List[str]) -> List[Optional[Dict[str, Any]]]:
         """
-        Use LLM to map canonical variables to available properties.
+        Extract NFG intents for several queries with a single LLM completion.
+        
+        Args:
+            texts: User query texts
+            
+        Returns:
+            Parsed intents in the same order as texts, None where the response
+            had no usable intent for a query
+        """
+        if not self.api_key:
+            logger.warning("No API key available for batched intent parsing.")
+            return [None] * len(texts)
+        
+        queries = [{"id": i, "query": text} for i, text in enumerate(texts)]
+        user_prompt = f"Queries:\n{json.dumps(queries)}\n\nJSON:"
+        
+        intents: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        try:
+            result = self.generate_completion(_NFG_INTENT_BATCH_SYSTEM_PROMPT, user_prompt, temperature=0.2)
+            array_match = _JSON_ARRAY_RE.search(result)
+            if not array_match:
+                logger.warning(f"No JSON array in batched intent response: {result[:100]}")
+                return intents
+            
+            for entry in _json_loads(array_match.group(0)):
+                if not isinstance(entry, dict):
+                    continue
+                try:
+                    index = int(entry.pop("id"))
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if 0 <= index < len(texts):
+                    intents[index] = self._fill_intent_fields(entry)
+        except Exception as e:
+            logger.error(f"Error parsing intents in batch: {str(e)}")
+        
+        return intents
+    
+    @staticmethod
+    def _fill_intent_fields(parsed: Dict[str, Any]) -> Dict[str, Any]:
+        """Give a parsed intent every field and drop null confidence scores"""
+        if not isinstance(parsed.get("confidence"), dict):
+            parsed["confidence"] = {}
+        for field in _INTENT_FIELDS:
+            parsed.setdefault(field, None)
+            if parsed["confidence"].get(field, 0) is None:
+                # Structured outputs report null confidence for unset fields
+                del parsed["confidence"][field]
+        return parsed
+
+    # Malformed JSON and transient API errors are retried with jittered exponential
+    # backoff; anything else fails straight through to the regex fallback
+    @retry(stop=stop_after_attempt(3),
+           wait=wait_exponential_jitter(initial=0.2, max=4),
+           retry=retry_if_exception_type((json.JSONDecodeError,) + _TRANSIENT_API_ERRORS),
+           before_sleep=before_sleep_log(logger, logging.WARNING),
+           reraise=True)
+    def _request_nfg_intent(self, user_prompt: str) -> Dict[str, Any]:
         """
-        system_prompt = """
-        You are an energy analytics expert specialized in NFG (Networks-Fuels-Generation) data.
-        Map the canonical variable to possible properties from the available list.
-        Return ONLY a valid JSON array with objects containing:
-        - property_name: exact name from available_properties that could match
-        - unit_name: expected unit of measure
-        - transform: description of any transform needed
+        Request an intent from the model and parse the JSON it returns.
         
-        Return empty array if no matches found.
+        Args:
+            user_prompt: Formatted user query
+            
+        Returns:
+            Dict with parsed intent fields
         """
+        # Use standard parameters that work across all models
+        # Only set temperature - let the model use its default token limits
+        result = self.complete_json(_NFG_INTENT_SYSTEM_PROMPT, user_prompt, temperature=0.2)
+        logger.debug(f"Raw LLM response: {result}")
+        
+        # Handle case where there might be markdown formatting
+        if result.startswith("```json"):
+            result = result[7:]
+        if result.endswith("```"):
+            result = result[:-3]
+        result = result.strip()
+        
+        # Debug the cleaned response
+        logger.debug(f"Cleaned response for JSON parsing: {result}")
         
-        prompt = f"{system_prompt}\n\nCanonical Variable: {canonical_var}\nAvailable Properties: {available_properties}\n\nJSON:"
+        # First try the tolerant extractor; strict parsing raises JSONDecodeError for the retry
+        parsed = extract_json_from_response(result)
+        if not parsed:
+            parsed = _json_loads(result)
+        logger.debug(f"Successfully parsed JSON: {parsed}")
+        
+        # Ensure expected fields exist
+        for field in ['metric', 'tech', 'country', 'year']:
+            if field not in parsed:
+                parsed[field] = None
+        if 'confidence' not in parsed:
+            parsed['confidence'] = {}
+        
+        return parsed
+
+    def get_variable_mapping(self, canonical_var: str, available_properties: List[str]) -> List[Dict[str, Any]]:
+        """
+        Use LLM to map canonical variables to available properties.
+        """
+        user_prompt = f"Canonical Variable: {canonical_var}\nAvailable Properties: {available_properties}\n\nJSON:"
+        
+        # Mappings only depend on the variable and the property list
+        disk_key = DiskCache.make_key("variable_mapping", self.model, canonical_var, list(available_properties))
+        cached = self._disk.get(disk_key)
+        if cached is not None:
+            return cached
         
         try:
             # Use standard parameters that work across all models
             # Only set temperature - let the model use its default token limits
             params = {"temperature": 0.2}
             
-            result = self.complete(prompt, **params)
+            result = self.generate_completion(_VAR_MAPPING_SYSTEM_PROMPT, user_prompt, **params)
             # Extract JSON
             if result.startswith("```json"):
                 result = result[7:]
             if result.endswith("```"):
                 result = result[:-3]
                 
-            mappings = json.loads(result.strip())
+            mappings = _json_loads(result)
+            self._disk.set(disk_key, mappings, expire=DISK_CACHE_TTL_S)
             return mappings
         except Exception as e:
             logger.error(f"Error mapping variables: {str(e)}")
             return []
+    
+    def get_variable_mappings_bulk(self, canonical_vars: List[str], available_properties: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Map several canonical variables against the same property list with a single LLM call.
+        Each variable's result is cached under the same key get_variable_mapping uses,
+        so later single-variable lookups are cache hits.
+        
+        Args:
+            canonical_vars: Canonical variable names
+            available_properties: Available properties in the CSVs
+            
+        Returns:
+            Dict mapping each canonical variable to its list of mappings (empty if none found)
+        """
+        properties = list(available_properties)
+        results = {}
+        disk_keys = {}
+        for var in dict.fromkeys(canonical_vars):
+            disk_keys[var] = DiskCache.make_key("variable_mapping", self.model, var, properties)
+            cached = self._disk.get(disk_keys[var])
+            if cached is not None:
+                results[var] = cached
+        
+        missing = [var for var in disk_keys if var not in results]
+        if not missing:
+            return results
+        
+        # Property list first so repeated calls share a cacheable prompt prefix
+        user_prompt = f"Available Properties: {properties}\nCanonical Variables: {missing}\n\nJSON:"
+        
+        try:
+            result = self.generate_completion(_VAR_MAPPING_BULK_SYSTEM_PROMPT, user_prompt, temperature=0.2)
+            # Extract JSON
+            if result.startswith("```json"):
+                result = result[7:]
+            if result.endswith("```"):
+                result = result[:-3]
+            
+            bulk = _json_loads(result)
+            if not isinstance(bulk, dict):
+                raise ValueError(f"expected a JSON object, got {type(bulk).__name__}")
+            
+            for var in missing:
+                mappings = bulk.get(var)
+                if isinstance(mappings, list):
+                    # Drop malformed entries (e.g. bare property names) so callers can rely on the dict shape
+                    mappings = [m for m in mappings if isinstance(m, dict) and m.get('property_name')]
+                    self._disk.set(disk_keys[var], mappings, expire=DISK_CACHE_TTL_S)
+                    results[var] = mappings
+        except Exception as e:
+            logger.error(f"Error mapping variables in bulk: {str(e)}")
+        
+        for var in missing:
+            results.setdefault(var, [])
+        return results
+    
     def guess_reasonable_value(self, canonical_var: str, filters: Dict[str, Any] = None) -> float:
         """
         Guess a reasonable value for a variable based on its name and filters.
@@ -579,11 +1577,12 @@ Remember to respond ONLY with the numeric value."""
             return None
             
         # Create a cache key based on variable and filters
-        cache_key = f"guess_{canonical_var}_{filters.get('tech', '')}{filters.get('country', '')}{filters.get('year', '')}"
+        cache_key = ("guess",) + self._fallback_cache_key(canonical_var, filters)
         
-        # Check if we already have this value cached in memory
-        if cache_key in self.value_cache:
-            return self.value_cache[cache_key]
+        # Check if we already have this value cached in memory or on disk
+        cached = self._get_cached_value(cache_key)
+        if cached is not None:
+            return cached
             
         try:
             # Create a detailed prompt asking for a typical value
@@ -603,24 +1602,24 @@ Remember to provide ONLY a number, with no text explanation or units."""
             
             # Extract numeric value from response with robust parsing
             clean_response = response_text.strip().replace(',', '')
-            value_match = re.search(r'-?\d+\.?\d*', clean_response)
+            value_match = _NUM_RE.search(clean_response)
             if value_match:
                 try:
                     value = float(value_match.group(0))
                     # Cache the result for future use
-                    self.value_cache[cache_key] = value
+                    self._store_value(cache_key, value)
                     return value
                 except ValueError:
                     logger.warning(f"Failed to convert matched value to float: {value_match.group(0)}")
             
             # If we didn't find a clean number, try more aggressive parsing
             # Extract any digits and decimal points, ignoring other characters
-            digits_only = ''.join([c for c in clean_response if c.isdigit() or c == '.'])
+            digits_only = _DIGITS_STRIP_RE.sub('', clean_response)
             try:
                 if digits_only:
                     value = float(digits_only)
                     # Cache the result for future use
-                    self.value_cache[cache_key] = value
+                    self._store_value(cache_key, value)
                     return value
             except ValueError:
                 logger.warning(f"Failed to parse digits from response: {digits_only}")
@@ -641,28 +1640,38 @@ Remember to provide ONLY a number, with no text explanation or units."""
         else:
             value = 100.0
             
-        # Cache even the default value
-        self.value_cache[cache_key] = value
+        # Cache even the default value (in memory only, so a later run can still ask the LLM)
+        with self._cache_lock:
+            self.value_cache[(self.model, cache_key)] = value
         return value
             
-    def _generate_keyword_mappings(self) -> Dict[str, Dict[str, List[str]]]:
+    def _generate_keyword_mappings(self) -> Dict[str, Dict[str, Tuple[str, ...]]]:
         """
         Generate keyword mappings for metrics, technologies, and countries using LLM.
         Used for regex fallback when main intent parsing fails.
         
         Returns:
             Dict with mappings for metrics, technologies, and countries
+            (lowercase keyword tuples keyed by interned canonical names)
         """
-        # Create a cache key
-        cache_key = "keyword_mappings"
+        # Create a cache key (the cache is shared by all instances)
+        cache_key = ("keyword_mappings", self.model)
         
         # Check if we already have generated these mappings
-        if hasattr(self, "_keyword_cache") and cache_key in self._keyword_cache:
-            return self._keyword_cache[cache_key]
-            
-        # Initialize cache attribute if it doesn't exist
-        if not hasattr(self, "_keyword_cache"):
-            self._keyword_cache = {}
+        mappings = self._keyword_cache.get(cache_key)
+        if mappings is not None:
+            return mappings
+        
+        # Mappings generated by an earlier process
+        disk_key = DiskCache.make_key("keyword_mappings", self.model)
+        mappings = self._disk.get(disk_key)
+        if mappings is not None:
+            mappings = _normalize_keyword_mappings(mappings)
+            with self._cache_lock:
+                self._keyword_cache[cache_key] = mappings
+            # Fallback results computed with the old keywords are stale
+            self._last_intent_text = None
+            return mappings
             
         system_prompt = """You are an energy systems expert helping to create keyword mappings.
 Generate mappings for metrics, technologies, and countries in the energy sector.
@@ -702,32 +1711,20 @@ Format as JSON with this structure:
             else:
                 json_text = response_text.strip()
                 
-            mappings = json.loads(json_text)
+            raw_mappings = _json_loads(json_text)
+            mappings = _normalize_keyword_mappings(raw_mappings)
             
             # Cache for future use
-            self._keyword_cache[cache_key] = mappings
+            with self._cache_lock:
+                self._keyword_cache[cache_key] = mappings
+            self._disk.set(disk_key, raw_mappings, expire=DISK_CACHE_TTL_S)
+            self._last_intent_text = None
             
             return mappings
         except Exception as e:
             logger.error(f"Error generating keyword mappings: {str(e)}")
             # Return minimal fallback
-            return {
-                "metrics": {
-                    "LCOE": ["lcoe", "levelized cost"],
-                    "NPV": ["npv", "net present value"],
-                    "CAPACITY_FACTOR": ["capacity factor", "cf"]
-                },
-                "technologies": {
-                    "NUCLEAR": ["nuclear"],
-                    "WIND": ["wind"],
-                    "SOLAR": ["solar"]
-                },
-                "countries": {
-                    "BE": ["belgium", "belgian"],
-                    "FR": ["france", "french"],
-                    "UK": ["uk", "united kingdom"]
-                }
-            }
+            return _MINIMAL_KEYWORD_MAPPINGS
     
     def determine_equation(self, metric: str) -> Dict[str, Any]:
         """
@@ -737,52 +1734,161 @@ Format as JSON with this structure:
             metric: Metric name
             
         Returns:
-            Dict with formula, required variables, and fallback
+            Dict with formula, unit and required variables; formula is None
+            (in a shared read-only mapping) if no equation could be determined
         """
         # No hardcoding - dynamically determine equation through LLM
         logger.info(f"Dynamically determining equation for {metric} using LLM")
             
-        system_prompt = """
-        You are an energy analytics expert specialized in NFG (Networks-Fuels-Generation) mathematics.
-        Provide the equation for calculating the given metric.
-        Return ONLY a valid JSON object with:
-        - formula: mathematical formula as string using only basic math operators (+, -, *, /, sum)
-        - required: array of required variable names
-        
-        IMPORTANT: The formula must be simple enough to be parsed by SymPy. 
-        For sum operations, use "sum([VAR])" instead of complex notations like "SUM(VAR_i for i=1..N)".
-        For CAPACITY_MW, use "UNIT_CAPACITY_MW" as the variable name.
-        - unit: unit of measure for result
-        
-        Example:
-        {
-          "formula": "TOTAL_GEN_COST_kUSD / GENERATION_GWh",
-          "required": ["TOTAL_GEN_COST_kUSD", "GENERATION_GWh"],
-          "unit": "USD/MWh"
-        }
-        """
-        
-        prompt = f"{system_prompt}\n\nMetric: {metric}\n\nJSON:"
+        # Static instructions go in the system message so repeated calls share a cacheable prefix
+        user_prompt = f"Metric: {metric}\n\nJSON:"
         
         try:
             # Use standard parameters that work across all models
             # Only set temperature - let the model use its default token limits
             params = {"temperature": 0.3}
             
-            result = self.complete(prompt, **params)
-            # Extract JSON
-            if result.startswith("```json"):
-                result = result[7:]
-            if result.endswith("```"):
-                result = result[:-3]
-                
-            equation = json.loads(result.strip())
+            result = self.generate_completion(_EQUATION_SYSTEM_PROMPT, user_prompt, **params)
+            
+            # Shared extractor: code fences, trailing prose and common JSON slips are handled there
+            equation = extract_json_from_response(result)
+            if not isinstance(equation, dict):
+                raise ValueError(f"expected a JSON object, got {type(equation).__name__}")
+            # Same shape as _EMPTY_EQUATION
+            equation.setdefault("formula", None)
+            equation.setdefault("unit", None)
+            equation.setdefault("required", [])
             return equation
         except Exception as e:
             logger.error(f"Error getting equation: {str(e)}")
-            return {
-                "formula": None,
-                "unit": None,
-                "required": [],
-                "fallback": {"formula": None, "required": []}
-            }
+            return _EMPTY_EQUATION
+    
+    def _complete_json_cached(self, combined_prompt: str) -> Union[Dict, List, None]:
+        """
+        Complete a fixed mapping prompt and parse its JSON, caching the parsed result
+        in process memory and on disk keyed by (model, prompt).
+        
+        Args:
+            combined_prompt: Full prompt sent to the LLM
+            
+        Returns:
+            Parsed JSON (a copy the caller may modify) or None if parsing failed
+        """
+        cache_key = DiskCache.make_key("enhanced_mapping", self.model, combined_prompt)
+        
+        result = self._keyword_cache.get(cache_key)
+        if result is None:
+            result = self._disk.get(cache_key)
+            if result is None:
+                # JSON mode makes the response directly parseable where the model supports it
+                kwargs = {"response_format": {"type": "json_object"}} if ModelConfig.get_json_mode(self.model) else {}
+                response_text = self.complete(combined_prompt, **kwargs)
+                result = extract_json_from_response(response_text)
+                if not result:
+                    return result
+                self._disk.set(cache_key, result, expire=DISK_CACHE_TTL_S)
+            with self._cache_lock:
+                self._keyword_cache[cache_key] = result
+        
+        # Callers merge the mappings into their own defaults, so never hand out the cached object
+        return copy.deepcopy(result)
+
+    def get_all_mappings(self) -> Dict[str, Any]:
+        """
+        Get tech, country, metric and property mappings from LLM knowledge in one call.
+        
+        Returns:
+            Dictionary with "tech", "country", "metric" and "property" sections
+            (empty if the request failed)
+        """
+        if not self.api_key:
+            logger.warning("No API key available for getting mappings.")
+            return {}
+        
+        try:
+            # Extract and parse JSON using our robust extraction function (cached per model)
+            all_mappings = self._complete_json_cached(_ALL_MAPPINGS_PROMPT)
+            if isinstance(all_mappings, dict):
+                return all_mappings
+            logger.warning("Could not extract mappings JSON from LLM response")
+        except Exception as e:
+            logger.error(f"Error getting mappings from LLM: {str(e)}")
+        
+        # Return empty dictionary if failed
+        return {}
+
+    def get_all_mappings_parallel(self) -> Dict[str, Any]:
+        """
+        Get the same sections as get_all_mappings, but with one smaller request per
+        section issued concurrently; wall time is that of the slowest request.
+        
+        Returns:
+            Dictionary with "tech", "country", "metric" and "property" sections
+            (a section is empty if its request failed)
+        """
+        if not self.api_key:
+            logger.warning("No API key available for getting mappings.")
+            return {}
+        
+        # The HTTP calls release the GIL, so threads overlap the round-trips
+        with ThreadPoolExecutor(max_workers=len(_MAPPING_PROMPTS)) as executor:
+            futures = {key: executor.submit(self._request_mapping_section, key) for key in _MAPPING_PROMPTS}
+            return {key: future.result() for key, future in futures.items()}
+
+    def _request_mapping_section(self, key: str) -> Dict[str, Any]:
+        """Request a single mapping section with its own prompt"""
+        task, request = _MAPPING_PROMPTS[key]
+        combined_prompt = f"You are an energy systems expert. \n{task}\n\n{request}\nRespond with ONLY a JSON dictionary, no explanation."
+        try:
+            section = self._complete_json_cached(combined_prompt)
+            if isinstance(section, dict):
+                return section
+            logger.warning(f"Could not extract {key} mappings JSON from LLM response")
+        except Exception as e:
+            logger.error(f"Error getting {key} mappings from LLM: {str(e)}")
+        return {}
+
+    def _get_mapping_section(self, key: str) -> Dict[str, Any]:
+        """Return one section of get_all_mappings, or an empty dictionary if it is missing"""
+        section = self.get_all_mappings().get(key)
+        if isinstance(section, dict) and section:
+            return section
+        if self.api_key:
+            logger.warning(f"Could not extract {key} mappings from LLM response")
+        return {}
+
+    def get_tech_mappings(self) -> Dict[str, List[str]]:
+        """
+        Get technology mappings from LLM knowledge.
+        
+        Returns:
+            Dictionary mapping canonical tech names to patterns in CSV
+        """
+        return self._get_mapping_section("tech")
+
+    def get_country_mappings(self) -> Dict[str, str]:
+        """
+        Get country code mappings from LLM knowledge.
+        
+        Returns:
+            Dictionary mapping canonical country codes to codes in CSV
+        """
+        return self._get_mapping_section("country")
+
+    def get_metric_info(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get metric information including full names and formatting specifications.
+        
+        Returns:
+            Dictionary with metric information
+        """
+        return self._get_mapping_section("metric")
+
+    def get_property_mappings(self) -> Dict[str, List[str]]:
+        """
+        Get property mappings for variables from LLM knowledge.
+        
+        Returns:
+            Dictionary mapping canonical variables to property names in CSV
+        """
+        return self._get_mapping_section("property")
@@ -2,7 +2,17 @@
 Model configuration management for the NFG Analytics Orchestrator.
 Contains configuration for different LLM models including parameter support.
 """
-from typing import Dict, List, Any, Set
+from typing import Dict, Any, Optional
+
+# Model name -> family, filled on first lookup of each name
+_FAMILY_CACHE: Dict[str, str] = {}
+
+# Capabilities assumed for models outside every known family
+_DEFAULT_FAMILY = {
+    "supports_temperature": True,
+    "token_param": "max_tokens",
+    "json_mode": None,
+}
 
 class ModelConfig:
     """Configuration for LLM models"""
@@ -12,54 +22,78 @@ class ModelConfig:
         "gpt-5": {
             "supports_temperature": False,
             "token_param": "max_completion_tokens",
+            "json_mode": "json_schema",
         },
         "gpt-4": {
             "supports_temperature": True,
             "token_param": "max_tokens",
+            # Older gpt-4 snapshots reject response_format entirely
+            "json_mode": None,
         },
         "gpt-3.5": {
             "supports_temperature": True, 
             "token_param": "max_tokens",
+            "json_mode": "json_object",
         },
         "claude": {
             "supports_temperature": True,
             "token_param": "max_tokens",
+            "json_mode": None,
         }
     }
     
     @classmethod
     def get_model_family(cls, model_name: str) -> str:
         """Determine the model family from the model name"""
-        for family in cls.MODEL_FAMILIES:
-            if model_name.startswith(family):
-                return family
-        return "default"
+        family = _FAMILY_CACHE.get(model_name)
+        if family is None:
+            # Longest prefix wins, so a more specific family is never shadowed
+            family = next(
+                (f for f in sorted(cls.MODEL_FAMILIES, key=len, reverse=True) if model_name.startswith(f)),
+                "default"
+            )
+            _FAMILY_CACHE[model_name] = family
+        return family
+    
+    @classmethod
+    def _family_config(cls, model_name: str) -> Dict[str, Any]:
+        """Get the configuration of the model's family (defaults for unknown models)"""
+        return cls.MODEL_FAMILIES.get(cls.get_model_family(model_name), _DEFAULT_FAMILY)
     
     @classmethod
     def supports_temperature(cls, model_name: str) -> bool:
         """Check if the model supports temperature parameter"""
-        family = cls.get_model_family(model_name)
-        return cls.MODEL_FAMILIES.get(family, {}).get("supports_temperature", True)
+        return cls._family_config(model_name).get("supports_temperature", True)
     
     @classmethod
     def get_token_param(cls, model_name: str) -> str:
         """Get the appropriate token parameter name for the model"""
-        family = cls.get_model_family(model_name)
-        return cls.MODEL_FAMILIES.get(family, {}).get("token_param", "max_tokens")
+        return cls._family_config(model_name).get("token_param", "max_tokens")
+    
+    @classmethod
+    def get_json_mode(cls, model_name: str) -> Optional[str]:
+        """
+        Get the strongest response_format the model supports:
+        "json_schema" (structured outputs), "json_object" (JSON mode) or None
+        """
+        return cls._family_config(model_name).get("json_mode")
     
     @classmethod
     def transform_params(cls, model_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """Transform parameters to be compatible with the specified model"""
         # Create a copy to avoid modifying the original
-        transformed = params.copy()
+        transformed = dict(params)
+        
+        # One family lookup for both checks
+        config = cls._family_config(model_name)
         
         # Handle token parameter
-        token_param = cls.get_token_param(model_name)
+        token_param = config["token_param"]
         if token_param != "max_tokens" and "max_tokens" in transformed:
             transformed[token_param] = transformed.pop("max_tokens")
         
         # Handle temperature parameter
-        if not cls.supports_temperature(model_name) and "temperature" in transformed:
-            transformed.pop("temperature")
+        if not config["supports_temperature"]:
+            transformed.pop("temperature", None)
             
         return transformed
@@ -4,25 +4,27 @@ No hardcoded mappings - all determined by LLM at runtime.
 Scope: electricity & gas systems, generation, fuels, storage, networks.
 """
 import logging
-from typing import Dict, Any, List, Optional, Tuple, Callable
+from typing import Dict, Any, List, Tuple, Callable
 
 logger = logging.getLogger(__name__)
 
 # Start with empty dictionaries - everything will be generated by LLM at runtime
-DEFAULT_FALLBACK_VALUES = {}
+# Fallback values are keyed by (canonical_var, tech, country, year), or (canonical_var,) without filters
+DEFAULT_FALLBACK_VALUES: Dict[Tuple[Any, ...], float] = {}
 VARIABLE_MAP = {}
 
 # No YAML files - all mappings will be dynamically determined by LLM
 VARIABLE_MAP = {}
 
 class VariableCatalog:
-    def __init__(self, variable_map: Dict[str, Any] = None, fallback_values: Dict[str, Dict[str, float]] = None):
+    def __init__(self, variable_map: Dict[str, Any] = None, fallback_values: Dict[Tuple[Any, ...], float] = None):
         """
         Initialize variable catalog with variable map.
         
         Args:
             variable_map: Optional map of canonical variables to properties/units
-            fallback_values: Optional map of fallback values for variables
+            fallback_values: Optional map of fallback values keyed by (canonical_var, tech, country, year),
+                or (canonical_var,) when no filters apply
         """
         self.variable_map = variable_map or VARIABLE_MAP
         # Add mapping for UNIT_CAPACITY_MW to handle both file formats
@@ -80,6 +82,43 @@ class VariableCatalog:
         # Return empty list if not found
         return []
     
+    def prefetch_mappings(self, canonical_vars: List[str], available_properties: List[str] = None) -> None:
+        """
+        Resolve mappings for several variables with one LLM call so that the
+        following get_mappings calls are served from memory.
+        
+        Args:
+            canonical_vars: Canonical variable names
+            available_properties: Optional list of available properties in the CSVs
+        """
+        if self.llm_provider is None or not available_properties:
+            return
+        if not hasattr(self.llm_provider, 'get_variable_mappings_bulk'):
+            return
+        
+        missing = [v for v in canonical_vars if not self.variable_map.get(v)]
+        if len(missing) < 2:
+            # A single variable is handled by get_mappings as before
+            return
+        
+        try:
+            bulk = self.llm_provider.get_variable_mappings_bulk(missing, available_properties)
+        except Exception as e:
+            logger.error(f"Error prefetching mappings: {str(e)}")
+            return
+        
+        for canonical_var, llm_mappings in bulk.items():
+            if not llm_mappings:
+                continue
+            try:
+                # Convert to tuple format with identity transform
+                self.variable_map[canonical_var] = [
+                    (m.get('property_name'), m.get('unit_name', ''), lambda v: v) for m in llm_mappings
+                ]
+            except (IndexError, KeyError, AttributeError, TypeError):
+                # Leave the variable to get_mappings rather than abort the query
+                logger.warning(f"Invalid prefetched mapping format for {canonical_var}, skipping")
+    
     def get_fallback_value(self, canonical_var: str, filters: Dict[str, Any] = None) -> float:
         """
         Get a reasonable fallback value for a variable based on filters.
@@ -93,7 +132,7 @@ class VariableCatalog:
             A reasonable fallback value for the variable
         """
         # Check in-memory cache for performance
-        key = f"{canonical_var}_{filters.get('tech', '')}" if filters else canonical_var
+        key = (canonical_var, filters.get('tech'), filters.get('country'), filters.get('year')) if filters else (canonical_var,)
         if key in self.fallback_values:
             return self.fallback_values[key]
         
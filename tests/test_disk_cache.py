@@ -0,0 +1,73 @@
+"""
+Tests for the SQLite-backed DiskCache.
+"""
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from utils.disk_cache import DiskCache
+
+
+class DiskCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = DiskCache(self.directory)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_get_missing_returns_default(self):
+        self.assertIsNone(self.cache.get("missing"))
+        self.assertEqual(self.cache.get("missing", 42), 42)
+
+    def test_set_then_get_round_trips_json(self):
+        value = {"LCOE": [1.5, 2.0], "unit": "$/MWh"}
+        self.cache.set("key", value)
+        self.assertEqual(self.cache.get("key"), value)
+
+    def test_set_overwrites_existing_value(self):
+        self.cache.set("key", 1)
+        self.cache.set("key", 2)
+        self.assertEqual(self.cache.get("key"), 2)
+
+    def test_values_persist_across_connections(self):
+        self.cache.set("key", "value")
+        other = DiskCache(self.directory)
+        try:
+            self.assertEqual(other.get("key"), "value")
+        finally:
+            other.close()
+
+    def test_entry_expires_after_ttl(self):
+        with mock.patch("utils.disk_cache.time.time", return_value=1000.0):
+            self.cache.set("key", "value", expire=10)
+        with mock.patch("utils.disk_cache.time.time", return_value=1009.0):
+            self.assertEqual(self.cache.get("key"), "value")
+        with mock.patch("utils.disk_cache.time.time", return_value=1011.0):
+            self.assertIsNone(self.cache.get("key"))
+
+    def test_entry_without_ttl_never_expires(self):
+        self.cache.set("key", "value")
+        with mock.patch("utils.disk_cache.time.time", return_value=1e12):
+            self.assertEqual(self.cache.get("key"), "value")
+
+    def test_unserializable_value_is_not_stored(self):
+        self.cache.set("key", object())
+        self.assertIsNone(self.cache.get("key"))
+
+    def test_make_key_is_stable_and_order_sensitive(self):
+        self.assertEqual(DiskCache.make_key("a", {"x": 1, "y": 2}), DiskCache.make_key("a", {"y": 2, "x": 1}))
+        self.assertNotEqual(DiskCache.make_key("a", "b"), DiskCache.make_key("b", "a"))
+
+    def test_closed_cache_behaves_as_empty(self):
+        self.cache.set("key", "value")
+        self.cache.close()
+        self.assertIsNone(self.cache.get("key"))
+        self.cache.set("key", "value")
+        self.cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Hardcoded intents for the test queries in tools/test_multiple_countries.py,
+used by tools/fix_all_issues.py. Kept as a module so the dict is built once
+when first imported.
+"""
+
+# Query -> intent returned without parsing
+TEST_CASES = {
+    "LCOE for nuclear France 2050": {
+        "metric": "LCOE",
+        "tech": "NUCLEAR",
+        "country": "FR",
+        "year": 2050,
+        "fuel": None,
+        "network": None,
+        "operation": None,
+        "confidence": {
+            "metric": 0.95,
+            "tech": 0.95,
+            "country": 0.95,
+            "year": 0.95
+        }
+    },
+    "LCOE for solar Germany 2050": {
+        "metric": "LCOE",
+        "tech": "SOLAR",
+        "country": "DE",
+        "year": 2050,
+        "fuel": None,
+        "network": None,
+        "operation": None,
+        "confidence": {
+            "metric": 0.95,
+            "tech": 0.95,
+            "country": 0.95,
+            "year": 0.95
+        }
+    },
+    "LCOE for wind UK 2050": {
+        "metric": "LCOE",
+        "tech": "WIND",
+        "country": "UK",
+        "year": 2050,
+        "fuel": None,
+        "network": None,
+        "operation": None,
+        "confidence": {
+            "metric": 0.95,
+            "tech": 0.95,
+            "country": 0.95,
+            "year": 0.95
+        }
+    },
+    "LCOE for nuclear Italy 2050": {
+        "metric": "LCOE",
+        "tech": "NUCLEAR",
+        "country": "IT",
+        "year": 2050,
+        "fuel": None,
+        "network": None,
+        "operation": None,
+        "confidence": {
+            "metric": 0.95,
+            "tech": 0.95,
+            "country": 0.95,
+            "year": 0.95
+        }
+    },
+    "NPV for nuclear Belgium 2050": {
+        "metric": "NPV",
+        "tech": "NUCLEAR",
+        "country": "BE",
+        "year": 2050,
+        "fuel": None,
+        "network": None,
+        "operation": None,
+        "confidence": {
+            "metric": 0.95,
+            "tech": 0.95,
+            "country": 0.95,
+            "year": 0.95
+        }
+    },
+    "NPV for solar Spain 2050": {
+        "metric": "NPV",
+        "tech": "SOLAR",
+        "country": "ES",
+        "year": 2050,
+        "fuel": None,
+        "network": None,
+        "operation": None,
+        "confidence": {
+            "metric": 0.95,
+            "tech": 0.95,
+            "country": 0.95,
+            "year": 0.95
+        }
+    },
+    "Capacity factor for wind France 2050": {
+        "metric": "CAPACITY_FACTOR",
+        "tech": "WIND",
+        "country": "FR",
+        "year": 2050,
+        "fuel": None,
+        "network": None,
+        "operation": None,
+        "confidence": {
+            "metric": 0.95,
+            "tech": 0.95,
+            "country": 0.95,
+            "year": 0.95
+        }
+    }
+}
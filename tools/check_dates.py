@@ -3,19 +3,39 @@
 Script to check available years in the data
 """
 import os
-import pandas as pd
+import sys
+
+# Add the project directory to Python path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from utils.csv_cache import read_csv_cached, categorical_prefix_mask
 
 # Load the CSV file
 csv_path = os.path.join("data", "systemgenerators.csv")
-df = pd.read_csv(csv_path)
+# Only the columns this script uses; low-cardinality text as categories.
+# Later runs read the Parquet copy written next to the CSV
+df = read_csv_cached(
+    csv_path,
+    usecols=['category_name', 'child_name', 'date_string', 'property_name', 'value', 'unit_name'],
+    dtype={
+        'category_name': 'category',
+        'child_name': 'category',
+        'date_string': 'category',
+        'property_name': 'category',
+        'unit_name': 'category',
+    },
+    engine='c',
+    memory_map=True,
+)
 
 # Get unique date strings
 date_strings = df['date_string'].unique()
 print(f"Available date_string values: {sorted(date_strings)}")
 
-# Sample nuclear BE rows
-nuclear_be_rows = df[(df['category_name'] == 'Nuclear') & 
-                     (df['child_name'].str.startswith('BE'))]
+# Sample nuclear BE rows (the per-date sample below filters these, not the full frame)
+nuclear_be_mask = (df['category_name'] == 'Nuclear') & categorical_prefix_mask(df['child_name'], 'BE')
+nuclear_be_rows = df[nuclear_be_mask]
 
 # Get unique dates for nuclear BE
 nuclear_be_dates = nuclear_be_rows['date_string'].unique()
@@ -24,9 +44,7 @@ print(f"\nAvailable date_string values for Nuclear+BE: {sorted(nuclear_be_dates)
 # Check sample data for one of these dates
 if len(nuclear_be_dates) > 0:
     sample_date = nuclear_be_dates[0]
-    sample_rows = df[(df['category_name'] == 'Nuclear') & 
-                     (df['child_name'].str.startswith('BE')) & 
-                     (df['date_string'] == sample_date)]
+    sample_rows = nuclear_be_rows[nuclear_be_rows['date_string'] == sample_date]
     
     print(f"\nSample data for Nuclear + BE + {sample_date}:")
     
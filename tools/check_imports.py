@@ -19,6 +19,10 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, PROJECT_ROOT)
 logger.info(f"Added {PROJECT_ROOT} to Python path")
 
+# Directory tree listing limits
+MAX_TREE_DEPTH = 3
+SKIP_DIRS = {'.git', '__pycache__', 'node_modules', '.venv', 'venv', '.llm_cache', '.pytest_cache'}
+
 def check_imports():
     """Check all imports to diagnose issues"""
     logger.info("Testing imports...")
@@ -58,16 +62,19 @@ def check_imports():
     # Print Python path for debugging
     logger.info(f"Python path (sys.path): {sys.path}")
     
-    # Check directory structure
-    logger.info(f"Directory structure:")
+    # Check directory structure (bounded, noise directories skipped, logged in one call)
+    lines = ["Directory structure:"]
     for root, dirs, files in os.walk(PROJECT_ROOT, topdown=True, followlinks=False):
         level = root.replace(PROJECT_ROOT, '').count(os.sep)
+        # Prune in place so os.walk never descends into these
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS] if level < MAX_TREE_DEPTH else []
         indent = ' ' * 4 * (level)
-        logger.info(f"{indent}{os.path.basename(root)}/")
+        lines.append(f"{indent}{os.path.basename(root)}/")
         sub_indent = ' ' * 4 * (level + 1)
         for file in files:
             if file.endswith('.py'):
-                logger.info(f"{sub_indent}{file}")
+                lines.append(f"{sub_indent}{file}")
+    logger.info("\n".join(lines))
 
 if __name__ == "__main__":
     logger.info("Starting import diagnostics")
@@ -5,6 +5,7 @@ Tool to check token limits for different models.
 import os
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -34,21 +35,24 @@ def main():
             "gpt-3.5-turbo"
         ]
         
-        print("Token limits for different models:")
-        print("=" * 50)
+        # Providers are independent, so set them up concurrently (map keeps model order)
+        with ThreadPoolExecutor(max_workers=len(models)) as executor:
+            providers = list(executor.map(lambda m: LLMProvider(api_key=api_key, model=m), models))
         
-        for model in models:
-            provider = LLMProvider(api_key=api_key, model=model)
+        # Build each report and write it in one call
+        lines = ["Token limits for different models:", "=" * 50]
+        for provider in providers:
             limits = provider.get_token_limit_info()
             
-            print(f"Model: {limits['model']}")
-            print(f"  - Input token limit: {limits['input_token_limit']:,}")
-            print(f"  - Output token limit: {limits['output_token_limit']:,}")
-            print(f"  - Model family: {limits['family']}")
-            print("-" * 50)
+            lines.append(f"Model: {limits['model']}")
+            lines.append(f"  - Input token limit: {limits['input_token_limit']:,}")
+            lines.append(f"  - Output token limit: {limits['output_token_limit']:,}")
+            lines.append(f"  - Model family: {limits['family']}")
+            lines.append("-" * 50)
+        sys.stdout.write("\n".join(lines) + "\n")
         
-        # Test token counting
-        test_provider = LLMProvider(api_key=api_key, model="gpt-5-mini")
+        # Test token counting (reusing the gpt-5-mini provider from above)
+        test_provider = providers[models.index("gpt-5-mini")]
         
         sample_texts = [
             "This is a short test.",
@@ -57,19 +61,18 @@ def main():
             "A" * 10000,  # 10,000 character string
         ]
         
-        print("\nToken counting examples:")
-        print("=" * 50)
-        
+        lines = ["\nToken counting examples:", "=" * 50]
         for i, text in enumerate(sample_texts):
             token_count = test_provider.count_tokens(text)
             char_count = len(text)
             ratio = token_count / char_count if char_count > 0 else 0
             
-            print(f"Sample {i+1} ({char_count} chars):")
-            print(f"  - Token count: {token_count}")
-            print(f"  - Tokens per character: {ratio:.2f}")
-            print("-" * 50)
-            
+            lines.append(f"Sample {i+1} ({char_count} chars):")
+            lines.append(f"  - Token count: {token_count}")
+            lines.append(f"  - Tokens per character: {ratio:.2f}")
+            lines.append("-" * 50)
+        sys.stdout.write("\n".join(lines) + "\n")
+        
         return True
         
     except Exception as e:
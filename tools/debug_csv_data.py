@@ -3,40 +3,64 @@
 Script to directly examine CSV data and debug extraction issues
 """
 import os
-import pandas as pd
+import sys
+import csv
 
-# Load the CSV file
-csv_path = os.path.join("data", "systemgenerators.csv")
-df = pd.read_csv(csv_path)
-
-# Print basic info
-print(f"CSV file has {len(df)} rows and {len(df.columns)} columns")
-print(f"Column names: {list(df.columns)}")
-
-# Count nuclear rows
-nuclear_rows = df[df['category_name'] == 'Nuclear']
-print(f"Found {len(nuclear_rows)} rows with category_name = 'Nuclear'")
+# Add the project directory to Python path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
 
-# Count Belgium rows
-be_rows = df[df['child_name'].str.startswith('BE')]
-print(f"Found {len(be_rows)} rows with child_name starting with 'BE'")
+from utils.csv_cache import read_csv_cached, categorical_prefix_mask
 
-# Count rows for both nuclear and Belgium
-nuclear_be_rows = df[(df['category_name'] == 'Nuclear') & (df['child_name'].str.startswith('BE'))]
-print(f"Found {len(nuclear_be_rows)} rows with category_name = 'Nuclear' AND child_name starting with 'BE'")
-
-# Count rows for 2050
-year_2050_rows = df[df['date_string'] == '2050']
-print(f"Found {len(year_2050_rows)} rows with date_string = '2050'")
+# Count the filter matches in one streaming pass; pandas is only needed for the samples
+csv_path = os.path.join("data", "systemgenerators.csv")
+total_rows = nuclear_count = be_count = nuclear_be_count = year_2050_count = combined_count = 0
+with open(csv_path, newline='') as f:
+    reader = csv.DictReader(f)
+    columns = reader.fieldnames or []
+    for row in reader:
+        total_rows += 1
+        is_nuclear = row['category_name'] == 'Nuclear'
+        is_be = row['child_name'].startswith('BE')
+        is_2050 = row['date_string'] == '2050'
+        nuclear_count += is_nuclear
+        be_count += is_be
+        year_2050_count += is_2050
+        if is_nuclear and is_be:
+            nuclear_be_count += 1
+            combined_count += is_2050
 
-# Count rows for all three filters combined
-combined_rows = df[(df['category_name'] == 'Nuclear') & 
-                   (df['child_name'].str.startswith('BE')) & 
-                   (df['date_string'] == '2050')]
-print(f"Found {len(combined_rows)} rows matching all three filters")
+lines = [
+    f"CSV file has {total_rows} rows and {len(columns)} columns",
+    f"Column names: {columns}",
+    f"Found {nuclear_count} rows with category_name = 'Nuclear'",
+    f"Found {be_count} rows with child_name starting with 'BE'",
+    f"Found {nuclear_be_count} rows with category_name = 'Nuclear' AND child_name starting with 'BE'",
+    f"Found {year_2050_count} rows with date_string = '2050'",
+    f"Found {combined_count} rows matching all three filters",
+]
+print("\n".join(lines))
 
 # Sample combined rows
-if len(combined_rows) > 0:
+if combined_count > 0:
+    # Only load the frame when there is something to show: just the columns used,
+    # low-cardinality text as categories, from the Parquet copy on later runs
+    df = read_csv_cached(
+        csv_path,
+        usecols=['category_name', 'child_name', 'date_string', 'property_name', 'value', 'unit_name'],
+        dtype={
+            'category_name': 'category',
+            'child_name': 'category',
+            'date_string': 'category',
+            'property_name': 'category',
+            'unit_name': 'category',
+        },
+        engine='c',
+        memory_map=True,
+    )
+    combined_rows = df[(df['category_name'] == 'Nuclear') & 
+                       categorical_prefix_mask(df['child_name'], 'BE') & 
+                       (df['date_string'] == '2050')]
     print("\nSample data for Nuclear + BE + 2050:")
     # Get 5 rows with Total Generation Cost
     gen_cost_rows = combined_rows[combined_rows['property_name'] == 'Total Generation Cost']
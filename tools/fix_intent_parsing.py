@@ -7,9 +7,15 @@ the extract_json_from_response method to the LLMProvider class.
 import os
 import sys
 import json
-import re
 import logging
 
+# Optional Rust JSON parser; its JSONDecodeError subclasses json.JSONDecodeError
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 # Add the project directory to Python path
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, PROJECT_ROOT)
@@ -18,10 +24,46 @@ sys.path.insert(0, PROJECT_ROOT)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-from semantic.llm_provider import LLMProvider
+def _first_json_object(text):
+    """
+    Slice out the first balanced {...} span with one linear scan, ignoring
+    braces inside double-quoted strings.
+    
+    Args:
+        text: Text to search
+        
+    Returns:
+        The object text, or None if there is no balanced object
+    """
+    start = text.find('{')
+    if start < 0:
+        return None
+    depth = 0
+    in_str = False
+    esc = False
+    for i in range(start, len(text)):
+        c = text[i]
+        if in_str:
+            if esc:
+                esc = False
+            elif c == '\\':
+                esc = True
+            elif c == '"':
+                in_str = False
+        elif c == '"':
+            in_str = True
+        elif c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
 
 def add_json_extraction_method():
     """Add the extract_json_from_response method to the LLMProvider class"""
+    # Imported here so importing this module does not load the provider stack
+    from semantic.llm_provider import LLMProvider
     
     # Define the method to add
     def extract_json_from_response(self, text):
@@ -46,16 +88,15 @@ def add_json_extraction_method():
         
         try:
             # First attempt - direct parsing
-            return json.loads(text)
+            return _json_loads(text)
         except json.JSONDecodeError:
             logger.debug(f"Initial JSON parsing failed, trying enhanced extraction")
             
             # Try to find JSON between curly braces
-            json_pattern = r'\{(?:[^{}]|(?R))*\}'
-            match = re.search(json_pattern, text, re.DOTALL)
-            if match:
+            candidate = _first_json_object(text)
+            if candidate:
                 try:
-                    return json.loads(match.group(0))
+                    return _json_loads(candidate)
                 except json.JSONDecodeError:
                     pass
                     
@@ -0,0 +1,85 @@
+"""
+CSV loading with a Parquet side-cache for the NFG Analytics Orchestrator tools.
+The first load parses the CSV (with Arrow's multi-threaded reader when pyarrow
+is installed) and writes a Parquet copy next to it; later loads read the copy.
+"""
+import os
+import logging
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+# Optional Arrow support for the fast CSV reader and Parquet cache
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Options the pyarrow CSV engine rejects
+_C_ENGINE_ONLY_OPTIONS = ("engine", "memory_map")
+
+def read_csv_cached(csv_path: str, **read_csv_kwargs: Any) -> pd.DataFrame:
+    """
+    Load a CSV file, reusing a Parquet copy when it is at least as new as the CSV.
+
+    Args:
+        csv_path: Path to the CSV file
+        **read_csv_kwargs: Options for pd.read_csv (usecols also selects the Parquet columns)
+
+    Returns:
+        DataFrame with the requested columns and dtypes
+    """
+    if not PYARROW_AVAILABLE:
+        return pd.read_csv(csv_path, **read_csv_kwargs)
+
+    usecols = read_csv_kwargs.get("usecols")
+    parquet_path = os.path.splitext(csv_path)[0] + ".parquet"
+
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path):
+        try:
+            cached = pd.read_parquet(parquet_path)
+            if usecols is None or set(usecols) <= set(cached.columns):
+                if usecols is not None:
+                    cached = cached[[c for c in cached.columns if c in set(usecols)]]
+                # The copy may have been written with other dtypes than requested now
+                dtype = read_csv_kwargs.get("dtype") or {}
+                return cached.astype({col: kind for col, kind in dtype.items() if col in cached.columns})
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable Parquet cache {parquet_path}: {str(e)}")
+
+    kwargs = {k: v for k, v in read_csv_kwargs.items() if k not in _C_ENGINE_ONLY_OPTIONS}
+    # The pyarrow engine infers category values (e.g. "2050" becomes an integer),
+    # so read those columns as text and convert afterwards
+    dtype = kwargs.pop("dtype", None) or {}
+    categories = [col for col, kind in dtype.items() if kind == "category"]
+    kwargs["dtype"] = {col: ("string" if kind == "category" else kind) for col, kind in dtype.items()}
+    df = pd.read_csv(csv_path, engine="pyarrow", **kwargs)
+    if categories:
+        df = df.astype({col: "category" for col in categories})
+
+    try:
+        df.to_parquet(parquet_path, index=False)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not write Parquet cache {parquet_path}: {str(e)}")
+
+    return df
+
+def categorical_prefix_mask(series: pd.Series, prefix: str) -> np.ndarray:
+    """
+    Boolean mask of rows whose value starts with prefix, for a categorical column.
+    The string test runs once per category and is gathered to rows by code.
+
+    Args:
+        series: Categorical column
+        prefix: Required value prefix
+
+    Returns:
+        Boolean array aligned with series (False for missing values)
+    """
+    matches = np.asarray(series.cat.categories.str.startswith(prefix), dtype=bool)
+    # Missing values have code -1, which picks the trailing False
+    return np.append(matches, False)[series.cat.codes.to_numpy()]
@@ -0,0 +1,93 @@
+"""
+Persistent cache for the NFG Analytics Orchestrator.
+Used to keep LLM results across process restarts and share them between workers.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class DiskCache:
+    """Small SQLite-backed key-value cache for JSON-serializable values with optional expiry"""
+
+    def __init__(self, directory: str, filename: str = "cache.sqlite3"):
+        """
+        Open (or create) the cache database.
+        If the database cannot be opened the cache logs a warning and behaves as always-empty.
+
+        Args:
+            directory: Directory holding the cache database
+            filename: Database file name inside the directory
+        """
+        self._lock = threading.Lock()
+        self._conn = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(os.path.join(directory, filename), check_same_thread=False)
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+                )
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Disk cache disabled, could not open {directory}: {str(e)}")
+            self._conn = None
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Build a stable key from JSON-serializable parts"""
+        raw = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired"""
+        if self._conn is None:
+            return default
+
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache read failed: {str(e)}")
+            return default
+
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return default
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, expire: Optional[float] = None) -> None:
+        """Store a value, optionally expiring after the given number of seconds"""
+        if self._conn is None:
+            return
+
+        expires_at = time.time() + expire if expire is not None else None
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires_at)
+                )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Disk cache write failed: {str(e)}")
+
+    def clear(self) -> None:
+        """Remove every entry (mainly for testing)"""
+        if self._conn is None:
+            return
+
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache")
+
+    def close(self) -> None:
+        """Close the database connection; later reads miss and writes are dropped"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -4,12 +4,46 @@ Used to track API calls, performance, and other metrics.
 """
 import time
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any
+import queue
 import threading
 import json
+from collections import deque
+
+# Optional Rust JSON serializer for the metrics log line
+try:
+    import orjson
+    
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _json_dumps = json.dumps
 
 logger = logging.getLogger(__name__)
 
+# Number of recent latency samples kept for inspection; the average covers every call
+LATENCY_WINDOW = 1000
+
+# Counters each thread accumulates without locking; get_metrics adds them up
+_COUNTER_FIELDS = ("llm_calls", "llm_tokens_in", "llm_tokens_out", "llm_errors",
+                   "query_count", "cache_hits", "cache_misses")
+
+def _new_counters() -> Dict[str, Any]:
+    """Zeroed per-thread counters"""
+    counters = dict.fromkeys(_COUNTER_FIELDS, 0)
+    counters["latency_sum"] = 0.0
+    counters["calls_by_model"] = {}
+    return counters
+
+def _add_counters(total: Dict[str, Any], counters: Dict[str, Any]) -> None:
+    """Add one set of counters into another"""
+    for field in _COUNTER_FIELDS:
+        total[field] += counters[field]
+    total["latency_sum"] += counters["latency_sum"]
+    by_model = total["calls_by_model"]
+    for model, count in list(counters["calls_by_model"].items()):
+        by_model[model] = by_model.get(model, 0) + count
+
 class Metrics:
     """Simple metrics collection for the NFG Analytics Orchestrator"""
     
@@ -19,40 +53,74 @@ class Metrics:
     
     def __new__(cls):
         """Singleton pattern to ensure only one metrics instance"""
+        # Already created: reading the attribute is atomic, so skip the lock
+        instance = cls._instance
+        if instance is not None:
+            return instance
         with cls._lock:
             if cls._instance is None:
                 cls._instance = super(Metrics, cls).__new__(cls)
-                cls._instance._metrics = {
-                    "llm_calls": 0,
-                    "llm_tokens_in": 0,
-                    "llm_tokens_out": 0,
-                    "llm_latency": [],
-                    "llm_errors": 0,
-                    "calls_by_model": {},
-                    "query_count": 0,
-                    "cache_hits": 0,
-                    "cache_misses": 0
-                }
+                cls._instance._local = threading.local()
+                # (thread, counters) for every thread that recorded something; new
+                # threads announce themselves through the queue, drained by readers
+                cls._instance._thread_counters = []
+                # Bumped by reset; a thread whose counters predate it starts fresh ones
+                cls._instance._generation = 0
+                cls._instance._registrations = queue.SimpleQueue()
+                # Counters of threads that have exited
+                cls._instance._retired = _new_counters()
+                # deque.append is thread-safe, so the samples need no lock either
+                cls._instance._latency = deque(maxlen=LATENCY_WINDOW)
                 cls._instance._start_time = time.time()
             return cls._instance
     
+    def _counters(self) -> Dict[str, Any]:
+        """This thread's counters; recording never takes the lock"""
+        local = self._local
+        generation = self._generation
+        counters = getattr(local, "counters", None)
+        if counters is None or local.generation != generation:
+            counters = local.counters = _new_counters()
+            local.generation = generation
+            self._registrations.put((generation, threading.current_thread(), counters))
+            # Keep the queue and the dead threads' dicts bounded even if metrics are
+            # never read; skipped rather than waited for when a reader holds the lock
+            if self._lock.acquire(blocking=False):
+                try:
+                    self._drain_registrations()
+                    self._retire_dead_threads()
+                finally:
+                    self._lock.release()
+        return counters
+    
+    def _drain_registrations(self) -> None:
+        """Pick up threads that started recording since the last read (call with the lock held)"""
+        while True:
+            try:
+                generation, thread, counters = self._registrations.get_nowait()
+            except queue.Empty:
+                return
+            # Counters registered before a reset are dropped along with the old totals
+            if generation == self._generation:
+                self._thread_counters.append((thread, counters))
+    
     def record_llm_call(self, model: str, tokens_in: int = 0, 
                       tokens_out: int = 0, latency_ms: float = 0, 
                       error: bool = False) -> None:
         """Record metrics for an LLM API call"""
-        with self._lock:
-            self._metrics["llm_calls"] += 1
-            self._metrics["llm_tokens_in"] += tokens_in
-            self._metrics["llm_tokens_out"] += tokens_out
-            self._metrics["llm_latency"].append(latency_ms)
-            
-            if error:
-                self._metrics["llm_errors"] += 1
-            
-            # Track by model
-            if model not in self._metrics["calls_by_model"]:
-                self._metrics["calls_by_model"][model] = 0
-            self._metrics["calls_by_model"][model] += 1
+        counters = self._counters()
+        counters["llm_calls"] += 1
+        counters["llm_tokens_in"] += tokens_in
+        counters["llm_tokens_out"] += tokens_out
+        counters["latency_sum"] += latency_ms
+        self._latency.append(latency_ms)
+        
+        if error:
+            counters["llm_errors"] += 1
+        
+        # Track by model
+        by_model = counters["calls_by_model"]
+        by_model[model] = by_model.get(model, 0) + 1
     
 
     def track_api_call(self, model: str, prompt: str, result: str, duration: float) -> None:
@@ -62,67 +130,91 @@ class Metrics:
         tokens_out = len(result) // 4  # Rough estimate
         latency_ms = duration * 1000  # Convert to milliseconds
         
-        # Record using the standard method
+        # Record using the standard method (which also counts the call per model)
         self.record_llm_call(model, tokens_in, tokens_out, latency_ms)
-        
-        # Track calls by model
-        if model not in self._metrics["calls_by_model"]:
-            self._metrics["calls_by_model"][model] = 0
-        self._metrics["calls_by_model"][model] += 1
+    
     def record_query(self, cache_hit: bool = False) -> None:
         """Record a user query"""
-        with self._lock:
-            self._metrics["query_count"] += 1
-            if cache_hit:
-                self._metrics["cache_hits"] += 1
+        counters = self._counters()
+        counters["query_count"] += 1
+        if cache_hit:
+            counters["cache_hits"] += 1
+        else:
+            counters["cache_misses"] += 1
+    
+    def _retire_dead_threads(self) -> None:
+        """Fold the counters of exited threads into one set (call with the lock held)"""
+        live = []
+        for thread, counters in self._thread_counters:
+            if thread.is_alive():
+                live.append((thread, counters))
             else:
-                self._metrics["cache_misses"] += 1
+                # Nothing writes these any more
+                _add_counters(self._retired, counters)
+        self._thread_counters = live
+    
+    def _collect(self) -> Dict[str, Any]:
+        """Sum the counters of all threads (call with the lock held)"""
+        self._drain_registrations()
+        self._retire_dead_threads()
+        totals = _new_counters()
+        _add_counters(totals, self._retired)
+        for _, counters in self._thread_counters:
+            _add_counters(totals, counters)
+        return totals
     
     def get_metrics(self) -> Dict[str, Any]:
         """Get a copy of the current metrics"""
+        # Hold the lock only while the per-thread counters are summed; the
+        # derived values are computed from that snapshot afterwards
         with self._lock:
-            metrics = self._metrics.copy()
+            totals = self._collect()
+            latency = list(self._latency)
+            start_time = self._start_time
+        
+        metrics = {
+            "llm_calls": totals["llm_calls"],
+            "llm_tokens_in": totals["llm_tokens_in"],
+            "llm_tokens_out": totals["llm_tokens_out"],
+            "llm_latency": latency,
+            "llm_errors": totals["llm_errors"],
+            "calls_by_model": totals["calls_by_model"],
+            "query_count": totals["query_count"],
+            "cache_hits": totals["cache_hits"],
+            "cache_misses": totals["cache_misses"]
+        }
+        
+        # Calculate derived metrics
+        uptime_seconds = time.time() - start_time
+        metrics["uptime_seconds"] = uptime_seconds
+        
+        # Average over every call, from the running latency sum
+        if metrics["llm_calls"] > 0:
+            metrics["avg_latency_ms"] = totals["latency_sum"] / metrics["llm_calls"]
+            metrics["error_rate"] = metrics["llm_errors"] / metrics["llm_calls"]
+        else:
+            metrics["avg_latency_ms"] = 0
+            metrics["error_rate"] = 0
             
-            # Calculate derived metrics
-            uptime_seconds = time.time() - self._start_time
-            metrics["uptime_seconds"] = uptime_seconds
+        # Calculate cache hit rate
+        queries = metrics["cache_hits"] + metrics["cache_misses"]
+        metrics["cache_hit_rate"] = metrics["cache_hits"] / queries if queries > 0 else 0
             
-            # Calculate averages
-            if metrics["llm_latency"]:
-                metrics["avg_latency_ms"] = sum(metrics["llm_latency"]) / len(metrics["llm_latency"])
-            else:
-                metrics["avg_latency_ms"] = 0
-                
-            if metrics["llm_calls"] > 0:
-                metrics["error_rate"] = metrics["llm_errors"] / metrics["llm_calls"]
-            else:
-                metrics["error_rate"] = 0
-                
-            # Calculate cache hit rate
-            if (metrics["cache_hits"] + metrics["cache_misses"]) > 0:
-                metrics["cache_hit_rate"] = metrics["cache_hits"] / (metrics["cache_hits"] + metrics["cache_misses"])
-            else:
-                metrics["cache_hit_rate"] = 0
-                
-            return metrics
+        return metrics
     
     def log_metrics(self) -> None:
         """Log the current metrics"""
         metrics = self.get_metrics()
-        logger.info(f"Current metrics: {json.dumps(metrics)}")
+        logger.info(f"Current metrics: {_json_dumps(metrics)}")
     
     def reset(self) -> None:
         """Reset metrics (mainly for testing)"""
         with self._lock:
-            self._metrics = {
-                "llm_calls": 0,
-                "llm_tokens_in": 0,
-                "llm_tokens_out": 0,
-                "llm_latency": [],
-                "llm_errors": 0,
-                "calls_by_model": {},
-                "query_count": 0,
-                "cache_hits": 0,
-                "cache_misses": 0
-            }
+            # Never touch the dicts other threads write to: they notice the new
+            # generation on their next record and register fresh counters
+            self._generation += 1
+            self._drain_registrations()
+            self._thread_counters = []
+            self._retired = _new_counters()
+            self._latency.clear()
             self._start_time = time.time()